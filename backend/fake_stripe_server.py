@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Local fake Stripe API for load-testing the payment path.
+
+Implements the PaymentIntent endpoints the backend uses (create, retrieve and
+confirm) with configurable latency and failure rate, so the async payment
+facade can be exercised at high concurrency without touching Stripe.
+
+Point the backend at it with:
+    STRIPE_SECRET_KEY=sk_test_fake STRIPE_API_BASE=http://127.0.0.1:12111
+
+Usage:
+    python fake_stripe_server.py [--port 12111] [--latency-ms 200] [--jitter-ms 50] [--failure-rate 0.0]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+class FakeStripeState:
+    def __init__(self, latency_ms: float, jitter_ms: float, failure_rate: float, auto_succeed: bool):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.auto_succeed = auto_succeed
+        self.intents = {}
+        self.lock = threading.Lock()
+        self.request_count = 0
+    
+    def delay(self):
+        """Sleep for the configured latency plus jitter."""
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+    
+    def should_fail(self) -> bool:
+        return random.random() < self.failure_rate
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: FakeStripeState = None
+    
+    def do_POST(self):
+        params = self._read_form()
+        parts = self.path.strip('/').split('/')
+        
+        if parts[:2] == ['v1', 'payment_intents'] and len(parts) == 2:
+            self._respond_after_delay(lambda: self._create_intent(params))
+        elif parts[:2] == ['v1', 'payment_intents'] and len(parts) == 4 and parts[3] == 'confirm':
+            self._respond_after_delay(lambda: self._set_status(parts[2], 'succeeded'))
+        else:
+            self._send(404, self._error('invalid_request_error', f"Unrecognized request URL (POST: {self.path})"))
+    
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        
+        if parts[:2] == ['v1', 'payment_intents'] and len(parts) == 3:
+            self._respond_after_delay(lambda: self._retrieve_intent(parts[2]))
+        elif parts == ['stats']:
+            self._send(200, {'requests': self.state.request_count, 'intents': len(self.state.intents)})
+        else:
+            self._send(404, self._error('invalid_request_error', f"Unrecognized request URL (GET: {self.path})"))
+    
+    def _respond_after_delay(self, handler):
+        with self.state.lock:
+            self.state.request_count += 1
+        self.state.delay()
+        if self.state.should_fail():
+            self._send(500, self._error('api_error', 'Injected failure from fake Stripe server'))
+            return
+        status, body = handler()
+        self._send(status, body)
+    
+    def _create_intent(self, params):
+        intent_id = f"pi_fake_{uuid.uuid4().hex[:24]}"
+        metadata = {key[9:-1]: value for key, value in params.items() if key.startswith('metadata[')}
+        intent = {
+            'id': intent_id,
+            'object': 'payment_intent',
+            'amount': int(params.get('amount', 0)),
+            'currency': params.get('currency', 'usd'),
+            'client_secret': f"{intent_id}_secret_{uuid.uuid4().hex[:16]}",
+            'description': params.get('description'),
+            'metadata': metadata,
+            'status': 'requires_payment_method',
+            'created': int(time.time()),
+            'livemode': False
+        }
+        with self.state.lock:
+            self.state.intents[intent_id] = intent
+        return 200, intent
+    
+    def _retrieve_intent(self, intent_id):
+        with self.state.lock:
+            intent = self.state.intents.get(intent_id)
+            if intent and self.state.auto_succeed:
+                intent['status'] = 'succeeded'
+        if not intent:
+            return 404, self._error('invalid_request_error', f"No such payment_intent: '{intent_id}'")
+        return 200, intent
+    
+    def _set_status(self, intent_id, status):
+        with self.state.lock:
+            intent = self.state.intents.get(intent_id)
+            if intent:
+                intent['status'] = status
+        if not intent:
+            return 404, self._error('invalid_request_error', f"No such payment_intent: '{intent_id}'")
+        return 200, intent
+    
+    def _read_form(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode() if length else ''
+        return dict(parse_qsl(body))
+    
+    def _error(self, error_type, message):
+        return {'error': {'type': error_type, 'message': message}}
+    
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Request-Id', f"req_fake_{uuid.uuid4().hex[:14]}")
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fake Stripe PaymentIntent API for load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=12111)
+    parser.add_argument('--latency-ms', type=float, default=200, help="Mean response latency")
+    parser.add_argument('--jitter-ms', type=float, default=50, help="Uniform latency jitter")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument('--no-auto-succeed', action='store_true',
+                        help="Keep intents pending on retrieve until /confirm is called")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    FakeStripeHandler.state = FakeStripeState(
+        args.latency_ms, args.jitter_ms, args.failure_rate, not args.no_auto_succeed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), FakeStripeHandler)
+    server.daemon_threads = True
+    print(f"Fake Stripe API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Multi-worker run mode: gunicorn -c gunicorn.conf.py server:app (from backend/)
+
+Each worker is a uvicorn event loop with its own Mongo pool, Stripe pool, webhook
+consumers, local caches and metrics, started in the app's lifespan handler. Workers
+share Mongo (idempotency keys, webhook inbox, and rate limits unless a shared cache
+is configured) and, with SHARED_CACHE_URL, a local Redis-compatible cache for hot
+data and rate-limit counters. See contracts.md.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:8001')
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count())))
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# Import the app (and validate the rules file) once in the master; workers share those pages
+# copy-on-write. Clients, thread pools and background tasks are only created per worker at startup.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# POST /api/admin/rules/reload only reloads the worker that handles it; every worker watching the
+# rules file is what keeps them on the same version. Set to 0 to turn the watchers off.
+os.environ.setdefault('RULES_WATCH_INTERVAL_SECONDS', '5')
+
+# Leave time for the lifespan shutdown to flush queued writes and finish webhook jobs
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers now and then so slow leaks can't build up; jitter keeps them from restarting together.
+# GUNICORN_MAX_REQUESTS=0 turns recycling off
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
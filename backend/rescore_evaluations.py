@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Re-score stored VC evaluations with the current scoring rules.
+
+Streams the vc_evaluations collection in batches, re-scores each batch with
+ScoringEngine and writes back total_score, section_scores, verdict and the
+executive summary with unordered bulk writes, dropping any premium analysis
+precomputed from the old scores. Progress is checkpointed by _id so an
+interrupted run resumes where it stopped; a completed run clears its checkpoint.
+
+Usage:
+    python rescore_evaluations.py [--batch-size 500] [--max-in-flight 4] [--reset] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+# Before the service imports: their singletons read settings when they are constructed
+load_dotenv(ROOT_DIR / '.env')
+
+from services.database import database
+from services.rescoring_service import RescoringService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Re-score stored VC evaluations")
+    parser.add_argument('--batch-size', type=int, default=500, help="Documents per batch")
+    parser.add_argument('--max-in-flight', type=int, default=4, help="Maximum concurrent batch writes")
+    parser.add_argument('--job-name', default='rescore-evaluations', help="Checkpoint name for this run")
+    parser.add_argument('--reset', action='store_true', help="Discard the checkpoint of an interrupted run and start over")
+    parser.add_argument('--dry-run', action='store_true', help="Score and report without writing")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    
+    db = database.connect()
+    
+    try:
+        service = RescoringService(
+            db,
+            batch_size=args.batch_size,
+            max_in_flight=args.max_in_flight,
+            job_name=args.job_name
+        )
+        if args.reset and not args.dry_run:
+            await service.reset_checkpoint()
+        
+        stats = await service.run(resume=not args.reset, dry_run=args.dry_run)
+        logger.info(
+            f"Scanned {stats['scanned']}, updated {stats['updated']}, "
+            f"unchanged {stats['unchanged']}, failed {stats['failed']}"
+        )
+    finally:
+        database.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import PlainTextResponse
+from typing import Dict, Any, Optional
+from pydantic import BaseModel
+import hmac
+import os
+import logging
+
+from services.profiler import profiler
+from services.rules import rules_provider, RulesError
+
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+class ProfilerConfig(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = None
+    interval_ms: Optional[float] = None
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured ADMIN_TOKEN; admin routes don't exist without one."""
+    admin_token = os.getenv('ADMIN_TOKEN')
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.get("/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def get_profile(reset: bool = False):
+    """Collapsed-stack dump of sampled requests (pipe into flamegraph.pl or speedscope)."""
+    collapsed = profiler.collapsed()
+    if reset:
+        profiler.reset()
+    return PlainTextResponse(collapsed)
+
+@router.get("/profile/status", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def get_profile_status():
+    """Current profiler settings and sample counts."""
+    return {"success": True, "data": profiler.status()}
+
+@router.put("/profile", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def configure_profile(config: ProfilerConfig):
+    """Enable, disable or retune sampling at runtime."""
+    try:
+        profiler.configure(config.enabled, config.sample_rate, config.interval_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"Profiler configured: enabled={profiler.enabled}, sample_rate={profiler.sample_rate}")
+    return {"success": True, "data": profiler.status()}
+
+@router.delete("/profile", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def reset_profile():
+    """Discard collected samples."""
+    profiler.reset()
+    return {"success": True, "data": profiler.status()}
+
+@router.get("/rules", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def get_rules_status():
+    """Version, fingerprint and source of the rules in effect in the worker that answered."""
+    return {"success": True, "data": {**rules_provider.status(), "pid": os.getpid()}}
+
+@router.post("/rules/reload", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def reload_rules():
+    """Re-read the rules file in this process; invalid files are rejected and the current rules kept.
+    
+    Only the worker handling the request reloads here. Other workers pick up the edited file through
+    their own watcher (RULES_WATCH_INTERVAL_SECONDS); the pid says which worker answered.
+    """
+    try:
+        await rules_provider.reload()
+    except RulesError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"success": True, "data": {**rules_provider.status(), "pid": os.getpid()}}
@@ -1,31 +1,46 @@
-from fastapi import APIRouter, HTTPException, Request
-from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Dict, Any
-import os
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Dict, Any, Optional
 import logging
 
 from models.vc_models import PaymentIntentCreate
-from services.payment_service import PaymentService
+from services.async_payment_service import payment_service
+from services.database import get_db
+from services.metrics import metrics
+from services.deep_analysis_service import deep_analysis_service
+from services.idempotency import idempotency_store, IdempotencyError
+from services.webhook_inbox import webhook_inbox
+from services.premium_unlock import process_payment_succeeded
+from services.responses import render_json, json_response, prerendered_response
 
 logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter(prefix="/payments", tags=["payments"])
 
-# Initialize services
-payment_service = PaymentService()
-
-# Database connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'app_db')]
+# Stripe events processed by the webhook inbox consumers
+webhook_inbox.register_handler('payment_intent.succeeded', process_payment_succeeded)
 
 @router.post("/create-intent", response_model=Dict[str, Any])
-async def create_payment_intent(request: PaymentIntentCreate):
+async def create_payment_intent(request: PaymentIntentCreate, db: AsyncIOMotorDatabase = Depends(get_db),
+                                idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """Create a Stripe payment intent for premium analysis unlock."""
+    # Client retries with the same Idempotency-Key get the first intent back without another Stripe call
+    try:
+        result, replayed = await idempotency_store.run(
+            db, 'create_intent', idempotency_key, request.dict(),
+            lambda: _create_payment_intent(request, db, idempotency_key)
+        )
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return json_response(result, headers={"Idempotent-Replayed": "true"} if replayed else None)
+
+async def _create_payment_intent(request: PaymentIntentCreate, db: AsyncIOMotorDatabase,
+                                 idempotency_key: Optional[str] = None) -> Dict[str, Any]:
     try:
         # Verify evaluation exists
-        evaluation = await db.vc_evaluations.find_one({"id": request.evaluation_id})
+        with metrics.span('create_intent.db_fetch'):
+            evaluation = await db.vc_evaluations.find_one({"id": request.evaluation_id})
         if not evaluation:
             raise HTTPException(status_code=404, detail="Evaluation not found")
         
@@ -34,15 +49,20 @@ async def create_payment_intent(request: PaymentIntentCreate):
             raise HTTPException(status_code=400, detail="Premium analysis already unlocked for this evaluation")
         
         # Create payment intent
-        result = payment_service.create_payment_intent(
-            evaluation_id=request.evaluation_id,
-            amount=request.amount,
-            currency=request.currency
-        )
+        with metrics.span('create_intent.stripe'):
+            result = await payment_service.create_payment_intent(
+                evaluation_id=request.evaluation_id,
+                amount=request.amount,
+                currency=request.currency,
+                idempotency_key=idempotency_key
+            )
         
         if not result.get('success'):
             raise HTTPException(status_code=500, detail=result.get('error', 'Payment processing error'))
         
+        # Precompute the premium analysis while the user completes checkout
+        deep_analysis_service.schedule_precompute(db, request.evaluation_id, evaluation)
+        
         return {
             "success": True,
             "data": {
@@ -53,7 +73,7 @@ async def create_payment_intent(request: PaymentIntentCreate):
                 "publishable_key": payment_service.get_publishable_key()
             }
         }
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -61,7 +81,7 @@ async def create_payment_intent(request: PaymentIntentCreate):
         raise HTTPException(status_code=500, detail="Payment system error")
 
 @router.post("/webhook")
-async def stripe_webhook(request: Request):
+async def stripe_webhook(request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Handle Stripe webhook events."""
     try:
         payload = await request.body()
@@ -70,32 +90,39 @@ async def stripe_webhook(request: Request):
         if not signature:
             raise HTTPException(status_code=400, detail="Missing stripe-signature header")
         
-        result = payment_service.handle_webhook(payload.decode(), signature)
+        with metrics.span('webhook.verify_event'):
+            result = await payment_service.handle_webhook(payload.decode(), signature)
         
         if not result.get('success'):
             raise HTTPException(status_code=400, detail=result.get('error', 'Webhook processing error'))
         
-        return {"received": True}
+        # Persist the event and ack right away; the inbox consumers unlock the evaluation
+        if result.get('event_id'):
+            with metrics.span('webhook.enqueue'):
+                await webhook_inbox.enqueue(db, result['event_id'], result['event_type'], {
+                    "payment_intent_id": result.get('payment_intent_id'),
+                    "verification": result.get('verification')
+                })
         
+        return {"received": True}
+    
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Webhook error: {str(e)}")
         raise HTTPException(status_code=500, detail="Webhook processing error")
 
+# Never changes while the process runs, so it is serialized once
+_STRIPE_CONFIG_BODY = render_json({
+    "success": True,
+    "data": {
+        "publishable_key": payment_service.get_publishable_key(),
+        "currency": "usd",
+        "amount": 999  # $9.99 in cents
+    }
+})
+
 @router.get("/config")
 async def get_stripe_config():
     """Get Stripe configuration for frontend."""
-    try:
-        return {
-            "success": True,
-            "data": {
-                "publishable_key": payment_service.get_publishable_key(),
-                "currency": "usd",
-                "amount": 999  # $9.99 in cents
-            }
-        }
-        
-    except Exception as e:
-        logger.error(f"Get config error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Configuration error")
\ No newline at end of file
+    return prerendered_response(_STRIPE_CONFIG_BODY)
\ No newline at end of file
@@ -1,7 +1,6 @@
-from fastapi import APIRouter, HTTPException, Request
-from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Dict, Any
-import os
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Dict, Any, Optional, Tuple
 import logging
 import time
 from datetime import datetime
@@ -12,8 +11,20 @@ from models.vc_models import (
 )
 from services.scoring_engine import ScoringEngine
 from services.validation_service import ValidationService
-from services.payment_service import PaymentService
+from services.async_payment_service import payment_service
 from services.analysis_generator import AnalysisGenerator
+from services.result_cache import EvaluationResultCache
+from services.rate_limiter import SubmissionRateLimiter
+from services.deep_analysis_service import PRECOMPUTED_FIELD
+from services.database import get_db
+from services.metrics import metrics
+from services.write_behind import evaluation_writer
+from services.cache import content_hash
+from services.idempotency import idempotency_store, IdempotencyError
+from services.evaluation_cache import evaluation_cache
+from services.premium_unlock import unlock_and_record_payment, find_unlocked_by_payment
+from services.rules import Rules, rules_provider
+from services.responses import render_json, render_members, json_response, prerendered_response
 
 logger = logging.getLogger(__name__)
 
@@ -23,46 +34,60 @@ router = APIRouter(prefix="/vc-test", tags=["vc-test"])
 # Initialize services
 scoring_engine = ScoringEngine()
 validation_service = ValidationService()
-payment_service = PaymentService()
 analysis_generator = AnalysisGenerator()
+result_cache = EvaluationResultCache(scoring_engine, analysis_generator)
+rate_limiter = SubmissionRateLimiter(validation_service.max_submissions_per_day)
 
-# Database connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'app_db')]
+def _apply_rules(rules: Rules):
+    # Services read the current rules on each call; only the limiter keeps a copy
+    rate_limiter.set_limit(rules.validation['max_submissions_per_day'])
+
+rules_provider.subscribe(_apply_rules)
+
+EVALUATION_PROJECTION = {"form_data": 0, "csrf_token": 0, PRECOMPUTED_FIELD: 0}
 
 @router.post("/validate", response_model=ValidationResponse)
 async def validate_submission(request: ValidationRequest):
     """Validate form data and check anti-gaming measures."""
     try:
-        # Sanitize form data
-        sanitized_data = validation_service.sanitize_form_data(request.form_data)
-        
-        # Perform validation
-        is_valid, validation_errors, anti_gaming_flags = validation_service.validate_submission(
-            sanitized_data, request.session_metadata, request.startup_type
-        )
+        # Sanitize and validate (static results are reused by the following /evaluate call)
+        with metrics.span('validate.sanitize_and_validate'):
+            _, is_valid, validation_errors, anti_gaming_flags = validation_service.sanitize_and_validate(
+                request.form_data, request.session_metadata, request.startup_type
+            )
         
         return ValidationResponse(
             success=is_valid,
             validation_errors=validation_errors,
             anti_gaming_flags=anti_gaming_flags
         )
-        
+    
     except Exception as e:
         logger.error(f"Validation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Validation system error")
 
 @router.post("/evaluate", response_model=Dict[str, Any])
-async def evaluate_startup(request: VCEvaluationCreate):
+async def evaluate_startup(request: VCEvaluationCreate, http_request: Request,
+                           db: AsyncIOMotorDatabase = Depends(get_db),
+                           idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """Evaluate startup and generate score with executive summary."""
+    # Client retries with the same Idempotency-Key replay the first evaluation instead of creating another
     try:
-        # Validate the submission first
-        sanitized_data = validation_service.sanitize_form_data(request.form_data)
-        
-        is_valid, validation_errors, anti_gaming_flags = validation_service.validate_submission(
-            sanitized_data, request.session_metadata, request.startup_type
+        result, replayed = await idempotency_store.run(
+            db, 'evaluate', idempotency_key, request.dict(), lambda: _evaluate_startup(request, http_request, db)
         )
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return json_response(result, headers={"Idempotent-Replayed": "true"} if replayed else None)
+
+async def _evaluate_startup(request: VCEvaluationCreate, http_request: Request,
+                            db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    try:
+        # Validate the submission first (reuses the /validate results for the same payload)
+        with metrics.span('evaluate.sanitize_and_validate'):
+            sanitized_data, is_valid, validation_errors, anti_gaming_flags = validation_service.sanitize_and_validate(
+                request.form_data, request.session_metadata, request.startup_type
+            )
         
         if not is_valid:
             raise HTTPException(
@@ -74,31 +99,43 @@ async def evaluate_startup(request: VCEvaluationCreate):
                 }
             )
         
-        # Calculate scoring
-        scoring_result = scoring_engine.calculate_score(sanitized_data, request.startup_type)
+        # Enforce the per-user daily submission limit before any expensive work
+        user_uuid = request.session_metadata.get('user_uuid') or 'anonymous'
+        with metrics.span('evaluate.rate_limit'):
+            rate_limit = await rate_limiter.hit(db, _rate_limit_key(request, http_request))
+        if not rate_limit['allowed']:
+            raise HTTPException(
+                status_code=429,
+                detail={
+                    "message": "Submission limit reached",
+                    "retry_after_seconds": rate_limit['retry_after_seconds']
+                },
+                headers={"Retry-After": str(rate_limit['retry_after_seconds'])}
+            )
         
-        # Generate executive summary
-        executive_summary = analysis_generator.generate_executive_summary(
-            scoring_result['total_score'],
-            scoring_result['verdict'],
-            sanitized_data
-        )
+        # Calculate scoring and executive summary (served from the result cache for repeat submissions)
+        with metrics.span('evaluate.score_and_summary'):
+            scoring_result = await result_cache.get_or_compute(sanitized_data, request.startup_type, db)
+        executive_summary = scoring_result['executive_summary']
         
         # Create evaluation record
-        evaluation = VCEvaluation(
-            startup_type=request.startup_type,
-            form_data=sanitized_data,
-            total_score=scoring_result['total_score'],
-            section_scores=scoring_result['section_scores'],
-            verdict=scoring_result['verdict'],
-            executive_summary=executive_summary,
-            user_uuid=request.session_metadata.get('user_uuid', 'anonymous'),
-            csrf_token=request.session_metadata.get('csrf_token', ''),
-            submission_time_ms=int(time.time() * 1000)
-        )
+        with metrics.span('evaluate.build_record'):
+            evaluation = VCEvaluation(
+                startup_type=request.startup_type,
+                form_data=sanitized_data,
+                total_score=scoring_result['total_score'],
+                section_scores=scoring_result['section_scores'],
+                verdict=scoring_result['verdict'],
+                executive_summary=executive_summary,
+                user_uuid=user_uuid,
+                csrf_token=request.session_metadata.get('csrf_token', ''),
+                submission_time_ms=int(time.time() * 1000)
+            )
+            evaluation_document = evaluation.dict()
         
-        # Save to database
-        result = await db.vc_evaluations.insert_one(evaluation.dict())
+        # Save to database (batched with concurrent submissions when write-behind is enabled)
+        with metrics.span('evaluate.db_insert'):
+            await evaluation_writer.insert(db, evaluation_document)
         
         return {
             "success": True,
@@ -111,7 +148,7 @@ async def evaluate_startup(request: VCEvaluationCreate):
                 "premium_locked": True
             }
         }
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -119,68 +156,51 @@ async def evaluate_startup(request: VCEvaluationCreate):
         raise HTTPException(status_code=500, detail="Evaluation system error")
 
 @router.post("/unlock-premium", response_model=Dict[str, Any])
-async def unlock_premium_analysis(request: PremiumUnlockRequest):
+async def unlock_premium_analysis(request: PremiumUnlockRequest, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Unlock premium deep-dive analysis after payment verification."""
     try:
         # Verify payment
-        payment_verification = payment_service.verify_payment(request.stripe_payment_intent_id)
+        with metrics.span('unlock.verify_payment'):
+            payment_verification = await payment_service.verify_payment(request.stripe_payment_intent_id)
         
         if not payment_verification.get('success') or payment_verification.get('status') != 'succeeded':
             raise HTTPException(status_code=400, detail="Payment verification failed")
         
-        # Get evaluation record
-        evaluation_record = await db.vc_evaluations.find_one({"id": request.evaluation_id})
-        if not evaluation_record:
-            raise HTTPException(status_code=404, detail="Evaluation not found")
-        
-        # Check if already unlocked
-        if evaluation_record.get('premium_unlocked'):
-            raise HTTPException(status_code=400, detail="Premium analysis already unlocked")
-        
-        # Generate deep analysis
-        deep_analysis = analysis_generator.generate_deep_analysis(
-            evaluation_record['total_score'],
-            evaluation_record['section_scores'],
-            evaluation_record['form_data'],
-            evaluation_record['startup_type']
-        )
-        
-        # Update evaluation record
-        await db.vc_evaluations.update_one(
-            {"id": request.evaluation_id},
-            {
-                "$set": {
-                    "deep_analysis": deep_analysis,
-                    "premium_unlocked": True,
-                    "premium_unlocked_at": datetime.utcnow()
-                }
-            }
-        )
+        # A payment only unlocks the evaluation it was created for
+        paid_evaluation_id = (payment_verification.get('metadata') or {}).get('evaluation_id')
+        if paid_evaluation_id and paid_evaluation_id != request.evaluation_id:
+            raise HTTPException(status_code=400, detail="Payment does not match this evaluation")
         
-        # Record payment
+        # Claim the evaluation and record the payment (in one transaction on a replica set)
         payment_record = PaymentRecord(
             evaluation_id=request.evaluation_id,
             stripe_payment_intent_id=request.stripe_payment_intent_id,
             amount=payment_verification.get('amount', 999),
             status='succeeded'
         )
-        await db.payment_records.insert_one(payment_record.dict())
+        with metrics.span('unlock.db_update'):
+            evaluation_record = await unlock_and_record_payment(db, request.evaluation_id, payment_record)
         
-        # Generate recommendations
-        score = evaluation_record['total_score']
-        recommendations = _generate_recommendations(score, evaluation_record['startup_type'])
+        if not evaluation_record:
+            # Only the losing/invalid path pays for these lookups
+            if await db.vc_evaluations.find_one({"id": request.evaluation_id}, {"_id": 1}) is None:
+                raise HTTPException(status_code=404, detail="Evaluation not found")
+            # Unlocked by this same payment (retry, or the webhook got there first): return it again
+            evaluation_record = await find_unlocked_by_payment(
+                db, request.evaluation_id, request.stripe_payment_intent_id
+            )
+            if not evaluation_record:
+                raise HTTPException(status_code=400, detail="Premium analysis already unlocked")
         
-        return {
-            "success": True,
-            "data": {
-                "deep_analysis": deep_analysis,
-                "recommendations": recommendations['next_steps'],
-                "investment_readiness": recommendations['investment_readiness'],
-                "valuation_range": recommendations['valuation_range'],
-                "recommended_round": recommendations['recommended_round']
-            }
-        }
+        await evaluation_cache.invalidate(request.evaluation_id)
         
+        # Only the analysis text is serialized per request; the recommendations are pre-rendered
+        recommendations = _recommendation_members(evaluation_record['total_score'], evaluation_record['startup_type'])
+        return prerendered_response(b''.join((
+            b'{"success":true,"data":{"deep_analysis":', render_json(evaluation_record['deep_analysis']),
+            b',', recommendations, b'}}'
+        )))
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -188,70 +208,127 @@ async def unlock_premium_analysis(request: PremiumUnlockRequest):
         raise HTTPException(status_code=500, detail="Premium unlock system error")
 
 @router.get("/evaluation/{evaluation_id}", response_model=Dict[str, Any])
-async def get_evaluation(evaluation_id: str):
+async def get_evaluation(evaluation_id: str, request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get evaluation results by ID."""
     try:
-        evaluation = await db.vc_evaluations.find_one({"id": evaluation_id})
-        if not evaluation:
-            raise HTTPException(status_code=404, detail="Evaluation not found")
-        
-        # Convert ObjectId to string for serialization
-        if '_id' in evaluation:
-            evaluation['_id'] = str(evaluation['_id'])
-        
-        # Remove sensitive data
-        evaluation.pop('form_data', None)
-        evaluation.pop('csrf_token', None)
+        cached = await evaluation_cache.get(evaluation_id)
+        if cached is None:
+            # Sensitive and large fields never leave the database
+            with metrics.span('get_evaluation.db_fetch'):
+                evaluation = await db.vc_evaluations.find_one({"id": evaluation_id}, EVALUATION_PROJECTION)
+            if not evaluation:
+                raise HTTPException(status_code=404, detail="Evaluation not found")
+            
+            # Convert ObjectId to string for serialization
+            if '_id' in evaluation:
+                evaluation['_id'] = str(evaluation['_id'])
+            
+            # Cache the serialized body, so hits skip both validation and JSON encoding
+            cached = (f'"{content_hash(evaluation)}"', render_json({"success": True, "data": evaluation}))
+            await evaluation_cache.set(evaluation_id, cached)
         
-        return {
-            "success": True,
-            "data": evaluation
-        }
+        etag, body = cached
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=headers)
         
+        return prerendered_response(body, headers=headers)
+    
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Get evaluation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error")
 
-def _generate_recommendations(score: float, startup_type: str) -> Dict[str, Any]:
-    """Generate investment recommendations based on score."""
-    if score >= 80:
-        return {
-            "investment_readiness": "Series A Ready" if startup_type == 'launched' else "Seed Ready",
-            "valuation_range": "$10M+" if startup_type == 'launched' else "$3-10M",
-            "recommended_round": "Series A" if startup_type == 'launched' else "Seed",
-            "next_steps": [
-                "Prepare comprehensive due diligence materials",
-                "Develop 18-month growth projections",
-                "Build strategic advisor network",
-                "Establish key performance metrics dashboard"
-            ]
-        }
-    elif score >= 60:
-        return {
-            "investment_readiness": "Seed Ready" if startup_type == 'launched' else "Pre-Seed Ready",
-            "valuation_range": "$3-10M" if startup_type == 'launched' else "$0.5-3M",
-            "recommended_round": "Seed" if startup_type == 'launched' else "Pre-Seed",
-            "next_steps": [
-                "Focus on customer validation and early traction",
-                "Strengthen competitive moats and IP protection",
-                "Prepare detailed financial projections",
-                "Build strategic partnerships in target industry"
-            ]
-        }
-    else:
-        return {
-            "investment_readiness": "Pre-Seed" if startup_type == 'launched' else "Bootstrap/Accelerator",
-            "valuation_range": "$0.5-3M" if startup_type == 'launched' else "$0.1-1M",
-            "recommended_round": "Pre-Seed" if startup_type == 'launched' else "Bootstrap",
-            "next_steps": [
-                "Validate product-market fit with target customers",
-                "Develop minimum viable product (MVP)",
-                "Establish clear value proposition and pricing",
-                "Build founding team and advisory board"
-            ]
-        }
+def _rate_limit_key(request: VCEvaluationCreate, http_request: Request) -> str:
+    """The submitter's user_uuid, or its client address so clients without one don't share a bucket."""
+    user_uuid = request.session_metadata.get('user_uuid')
+    if user_uuid:
+        return user_uuid
+    client_host = http_request.client.host if http_request.client else None
+    return f"ip:{client_host}" if client_host else 'anonymous'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against the current ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in (candidate[2:] if candidate.startswith('W/') else candidate
+                                         for candidate in candidates)
+
+# Investment recommendations by readiness band (score >= 80, >= 60, below) and whether the startup has launched
+_RECOMMENDATIONS = {
+    ('high', True): {
+        "investment_readiness": "Series A Ready",
+        "valuation_range": "$10M+",
+        "recommended_round": "Series A"
+    },
+    ('high', False): {
+        "investment_readiness": "Seed Ready",
+        "valuation_range": "$3-10M",
+        "recommended_round": "Seed"
+    },
+    ('mid', True): {
+        "investment_readiness": "Seed Ready",
+        "valuation_range": "$3-10M",
+        "recommended_round": "Seed"
+    },
+    ('mid', False): {
+        "investment_readiness": "Pre-Seed Ready",
+        "valuation_range": "$0.5-3M",
+        "recommended_round": "Pre-Seed"
+    },
+    ('low', True): {
+        "investment_readiness": "Pre-Seed",
+        "valuation_range": "$0.5-3M",
+        "recommended_round": "Pre-Seed"
+    },
+    ('low', False): {
+        "investment_readiness": "Bootstrap/Accelerator",
+        "valuation_range": "$0.1-1M",
+        "recommended_round": "Bootstrap"
+    }
+}
+
+_NEXT_STEPS = {
+    'high': [
+        "Prepare comprehensive due diligence materials",
+        "Develop 18-month growth projections",
+        "Build strategic advisor network",
+        "Establish key performance metrics dashboard"
+    ],
+    'mid': [
+        "Focus on customer validation and early traction",
+        "Strengthen competitive moats and IP protection",
+        "Prepare detailed financial projections",
+        "Build strategic partnerships in target industry"
+    ],
+    'low': [
+        "Validate product-market fit with target customers",
+        "Develop minimum viable product (MVP)",
+        "Establish clear value proposition and pricing",
+        "Build founding team and advisory board"
+    ]
+}
+
+def _recommendation_key(score: float, startup_type: str) -> Tuple[str, bool]:
+    band = 'high' if score >= 80 else 'mid' if score >= 60 else 'low'
+    return band, startup_type == 'launched'
+
+# The unlock response's recommendation members, serialized once per table entry
+_RECOMMENDATION_MEMBERS = {
+    key: render_members({
+        "recommendations": _NEXT_STEPS[key[0]],
+        "investment_readiness": recommendations['investment_readiness'],
+        "valuation_range": recommendations['valuation_range'],
+        "recommended_round": recommendations['recommended_round']
+    })
+    for key, recommendations in _RECOMMENDATIONS.items()
+}
+
+def _recommendation_members(score: float, startup_type: str) -> bytes:
+    """Pre-rendered investment recommendations based on score."""
+    return _RECOMMENDATION_MEMBERS[_recommendation_key(score, startup_type)]
 
 @router.get("/health")
 async def health_check():
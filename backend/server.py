@@ -1,25 +1,49 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import PlainTextResponse, ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
 import os
+import asyncio
 import logging
 from pathlib import Path
 
-# Import route modules
-from routes.vc_test_routes import router as vc_test_router
-from routes.payment_routes import router as payment_router
-
 ROOT_DIR = Path(__file__).parent
+# Before the route imports: service singletons read their settings when they are constructed
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'app_db')]
+# Import route modules
+from routes.vc_test_routes import router as vc_test_router, result_cache, rate_limiter
+from routes.payment_routes import router as payment_router
+from routes.admin_routes import router as admin_router
+from services.database import database
+from services.deep_analysis_service import deep_analysis_service
+from services.metrics import metrics, MetricsMiddleware
+from services.profiler import profiler, ProfilerMiddleware
+from services.write_behind import evaluation_writer
+from services.idempotency import idempotency_store
+from services.payment_verification_cache import payment_verification_cache
+from services.webhook_inbox import webhook_inbox
+from services.async_payment_service import payment_service
+from services.rules import rules_provider
+from services.shared_cache import shared_cache
+from services.indexes import CORE_INDEX_PLAN, build_index_plan, apply_index_plan, summarize_index_report
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Do connection and SDK work at startup rather than import, so the module imports quickly."""
+    await startup_db_client()
+    try:
+        yield
+    finally:
+        await shutdown_db_client()
 
 # Create the main app without a prefix
-app = FastAPI(title="VC Investor Test API", version="1.0.0")
+# orjson for every JSON response; hot routes also skip response_model validation (services/responses.py)
+app = FastAPI(title="VC Investor Test API", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Collections whose indexes differ from the declared plan, filled in at startup
+index_report = {}
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -31,15 +55,53 @@ async def root():
 
 @api_router.get("/health")
 async def health():
-    return {"status": "healthy", "database": "connected", "services": "operational"}
+    return {
+        "status": "healthy",
+        "database": "connected",
+        "services": "operational",
+        "database_pool": database.get_pool_metrics(),
+        "index_drift": index_report,
+        "shared_cache": shared_cache.stats(),
+        "rules": rules_provider.status(),
+        "result_cache": result_cache.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "idempotency": idempotency_store.stats(),
+        "payment_verification_cache": payment_verification_cache.stats(),
+        "webhook_inbox": webhook_inbox.stats(),
+        "deep_analysis": deep_analysis_service.stats()
+    }
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage and request latency histograms plus service counters in Prometheus text format."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
 
 # Include sub-routers
 api_router.include_router(vc_test_router)
 api_router.include_router(payment_router)
+api_router.include_router(admin_router)
 
 # Include the main router in the app
 app.include_router(api_router)
 
+# Profiling can only be switched on by an admin, so without ADMIN_TOKEN the middleware is skipped
+if os.getenv('ADMIN_TOKEN'):
+    app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
+# Request timing is left out of the stack entirely when metrics are disabled
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+    metrics.register_collector('database_pool', database.get_pool_metrics)
+    metrics.register_collector('rules', rules_provider.status)
+    metrics.register_collector('shared_cache', shared_cache.stats)
+    metrics.register_collector('result_cache', result_cache.stats)
+    metrics.register_collector('rate_limiter', rate_limiter.stats)
+    metrics.register_collector('idempotency', idempotency_store.stats)
+    metrics.register_collector('payment_verification_cache', payment_verification_cache.stats)
+    metrics.register_collector('webhook_inbox', webhook_inbox.stats)
+    metrics.register_collector('deep_analysis', deep_analysis_service.stats)
+    metrics.register_collector('evaluation_writer', evaluation_writer.stats)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -55,24 +117,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("startup")
 async def startup_db_client():
-    """Create database indexes and initialize services."""
+    """Connect the shared database client, warm its pool and create indexes."""
+    db = database.connect()
+    # The Stripe SDK import and shared cache connection overlap the pool warm-up
+    await asyncio.gather(database.warm_up(), payment_service.start(), shared_cache.connect())
+    
+    # Create the declared index plan and report drift from it
     try:
-        # Create indexes for better performance
-        await db.vc_evaluations.create_index("id")
-        await db.vc_evaluations.create_index("user_uuid")
-        await db.vc_evaluations.create_index("created_at")
-        await db.payment_records.create_index("evaluation_id")
-        await db.payment_records.create_index("stripe_payment_intent_id")
-        
-        logger.info("Database indexes created successfully")
+        plan = build_index_plan(
+            CORE_INDEX_PLAN, result_cache.index_plan(), rate_limiter.index_plan(), idempotency_store.index_plan(),
+            webhook_inbox.index_plan()
+        )
+        index_report.update(summarize_index_report(await apply_index_plan(db, plan)))
         
+        if index_report:
+            logger.warning(f"Database indexes differ from the plan: {index_report}")
+        else:
+            logger.info("Database indexes match the plan")
+    
     except Exception as e:
         logger.error(f"Error creating database indexes: {str(e)}")
+    
+    # Process webhook events persisted by this or any other instance
+    webhook_inbox.start(db)
+    
+    # Rules were loaded and validated at import; pick up edits to the file from here on
+    logger.info(f"Serving rules version {rules_provider.current.version}")
+    rules_provider.start_watching()
 
-@app.on_event("shutdown")
 async def shutdown_db_client():
-    """Close database connection."""
-    client.close()
+    """Flush queued writes, finish background work and close database connection."""
+    await rules_provider.stop_watching()
+    await webhook_inbox.close()
+    await evaluation_writer.close()
+    await deep_analysis_service.drain()
+    payment_service.shutdown()
+    await shared_cache.close()
+    database.close()
     logger.info("Database connection closed")
\ No newline at end of file
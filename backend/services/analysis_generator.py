@@ -1,28 +1,33 @@
-from typing import Dict, Any
+from typing import Dict, Any, Mapping, Optional
 import logging
 from datetime import datetime
 
+from services.rules import Rules, rules_provider
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever summary or deep-analysis wording changes; cached and precomputed text keys on it
+TEMPLATE_VERSION = 2
+
 class AnalysisGenerator:
-    def __init__(self):
-        self.executive_summaries = {
-            'unicorn': "This startup demonstrates exceptional potential across all key metrics. The founding team combines deep domain expertise with proven execution capabilities, addressing a massive market opportunity with breakthrough innovation. Strong competitive moats and validated traction indicate unicorn-scale potential.",
-            
-            'strong': "A compelling investment opportunity with strong fundamentals. The team shows solid experience and technical capabilities, targeting a substantial market with clear customer pain points. Well-defined business model with promising early validation metrics.",
-            
-            'promising': "Shows meaningful potential but requires focused execution improvements. Core concept is sound with identifiable market opportunity, though competitive positioning and go-to-market strategy need strengthening. Good foundation for seed-stage investment.",
-            
-            'early': "Early-stage potential with foundational elements in place. Market opportunity exists but validation is limited. Team capabilities are developing and business model requires refinement. Suitable for pre-seed or accelerator programs.",
-            
-            'not-ready': "Significant foundational work needed before investment readiness. Core assumptions require validation, team composition needs strengthening, and market approach requires substantial refinement. Focus on customer development and product-market fit validation."
-        }
+    def __init__(self, rules: Optional[Rules] = None):
+        # Summary texts come from the shared, hot-reloadable rules unless pinned for this instance
+        self._pinned_rules = rules
+    
+    @property
+    def rules(self) -> Rules:
+        return self._pinned_rules or rules_provider.current
+    
+    @property
+    def executive_summaries(self) -> Mapping[str, str]:
+        return self.rules.analysis['executive_summaries']
     
     def generate_executive_summary(self, score: float, verdict: Dict[str, str], form_data: Dict[str, Any]) -> str:
         """Generate executive summary based on evaluation results."""
         try:
             category = verdict.get('category', 'not-ready')
-            base_summary = self.executive_summaries.get(category, self.executive_summaries['not-ready'])
+            executive_summaries = self.executive_summaries
+            base_summary = executive_summaries.get(category, executive_summaries['not-ready'])
             
             # Customize based on specific strengths/weaknesses
             customizations = self._analyze_strengths_weaknesses(form_data, score)
@@ -31,20 +36,25 @@ class AnalysisGenerator:
                 base_summary += f" {customizations}"
             
             return base_summary
-            
+        
         except Exception as e:
             logger.error(f"Error generating executive summary: {str(e)}")
             return "Analysis completed. Please review individual section scores for detailed insights."
     
     def generate_deep_analysis(self, score: float, section_scores: Dict[str, float], 
-                             form_data: Dict[str, Any], startup_type: str) -> str:
-        """Generate comprehensive deep-dive analysis."""
+                             form_data: Dict[str, Any], startup_type: str,
+                             evaluated_at: Optional[datetime] = None) -> str:
+        """Generate comprehensive deep-dive analysis.
+        
+        ``evaluated_at`` is the evaluation's creation time; analyses are generated ahead of unlock,
+        so the date shown must come from the evaluation rather than the clock.
+        """
         try:
             analysis_parts = []
             
             # Header with overall assessment
             analysis_parts.append(f"**COMPREHENSIVE VC ANALYSIS - SCORE: {score}/100**\n")
-            analysis_parts.append(f"*Evaluation Date: {datetime.now().strftime('%B %d, %Y')}*\n")
+            analysis_parts.append(f"*Evaluation Date: {(evaluated_at or datetime.utcnow()).strftime('%B %d, %Y')}*\n")
             
             # Founding Team Analysis
             team_analysis = self._analyze_founding_team(form_data, section_scores.get('founding-team', 0))
@@ -83,7 +93,7 @@ class AnalysisGenerator:
             analysis_parts.append(investment_rec)
             
             return "\n\n".join(analysis_parts)
-            
+        
         except Exception as e:
             logger.error(f"Error generating deep analysis: {str(e)}")
             return "Deep analysis generation encountered an error. Please contact support for assistance."
@@ -0,0 +1,112 @@
+from typing import Dict, Any, Optional, Callable
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from services.payment_service import PaymentService
+from services.payment_verification_cache import PaymentVerificationCache, payment_verification_cache
+
+logger = logging.getLogger(__name__)
+
+class AsyncPaymentService:
+    def __init__(self, payment_service: Optional[PaymentService] = None, max_workers: Optional[int] = None,
+                 max_concurrency: Optional[int] = None, timeout_seconds: Optional[float] = None,
+                 verification_cache: Optional[PaymentVerificationCache] = None):
+        self.payment_service = payment_service or PaymentService()
+        # Shared by default so a webhook received by one router answers unlocks handled by another (and,
+        # with SHARED_CACHE_URL, by other workers)
+        self.verification_cache = verification_cache or payment_verification_cache
+        
+        # Stripe SDK calls block, so they run on a dedicated bounded pool instead of the event loop
+        self.max_workers = max_workers or int(os.getenv('STRIPE_MAX_WORKERS', '8'))
+        self.max_concurrency = max_concurrency or int(os.getenv('STRIPE_MAX_CONCURRENCY', '16'))
+        self.timeout_seconds = timeout_seconds or float(os.getenv('STRIPE_TIMEOUT_SECONDS', '10'))
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stripe')
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+    
+    @property
+    def is_mock_mode(self) -> bool:
+        return self.payment_service.is_mock_mode
+    
+    async def start(self):
+        """Import the Stripe SDK on the worker pool so the first payment request doesn't pay for it."""
+        if self.is_mock_mode:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.payment_service.load_sdk)
+    
+    async def create_payment_intent(self, evaluation_id: str, amount: int = 999, currency: str = 'usd',
+                                    idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Create a Stripe payment intent without blocking the event loop."""
+        return await self._call(
+            'create_payment_intent',
+            partial(self.payment_service.create_payment_intent, evaluation_id, amount, currency, idempotency_key),
+            'Payment processing error'
+        )
+    
+    async def verify_payment(self, payment_intent_id: str) -> Dict[str, Any]:
+        """Verify a payment without blocking the event loop, answering from the verification cache when possible."""
+        cached = await self.verification_cache.fetch(payment_intent_id)
+        if cached is not None:
+            return cached
+        
+        verification = await self._call(
+            'verify_payment',
+            partial(self.payment_service.verify_payment, payment_intent_id),
+            'Payment verification error'
+        )
+        await self.verification_cache.save(payment_intent_id, verification)
+        return verification
+    
+    async def handle_webhook(self, payload: str, signature: str) -> Dict[str, Any]:
+        """Verify and handle a Stripe webhook event without blocking the event loop."""
+        result = await self._call(
+            'handle_webhook',
+            partial(self.payment_service.handle_webhook, payload, signature),
+            'Webhook processing error'
+        )
+        if result.get('success') and result.get('verification'):
+            await self.verification_cache.save(result['payment_intent_id'], result['verification'], from_webhook=True)
+        return result
+    
+    async def is_payment_successful(self, payment_intent_id: str) -> bool:
+        """Check if a payment was successful."""
+        verification = await self.verify_payment(payment_intent_id)
+        return verification.get('success', False) and verification.get('status') == 'succeeded'
+    
+    def get_publishable_key(self) -> str:
+        """Get the Stripe publishable key for frontend."""
+        return self.payment_service.get_publishable_key()
+    
+    def shutdown(self):
+        """Stop accepting Stripe calls and release the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _call(self, operation: str, func: Callable[[], Dict[str, Any]], error_message: str) -> Dict[str, Any]:
+        """Run a blocking PaymentService call on the pool with a concurrency limit and timeout."""
+        if self.is_mock_mode:
+            # Mock mode never touches the network
+            return func()
+        
+        loop = asyncio.get_running_loop()
+        try:
+            # The timeout covers both waiting for a free slot and the Stripe round-trip
+            return await asyncio.wait_for(self._run_limited(loop, func), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.error(f"Stripe {operation} timed out after {self.timeout_seconds}s")
+            return {
+                'success': False,
+                'error': error_message,
+                'details': 'Payment provider timeout'
+            }
+    
+    async def _run_limited(self, loop, func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Run a call on the Stripe pool once a concurrency slot is free."""
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, func)
+
+# Shared by both routers so there is one Stripe worker pool per process
+payment_service = AsyncPaymentService()
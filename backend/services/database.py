@@ -0,0 +1,156 @@
+from typing import Dict, Any, Optional
+import os
+import asyncio
+import logging
+import threading
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    # Collects connection pool counters from pymongo's monitoring events
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'connections_checked_out': 0,
+            'checkouts_total': 0,
+            'checkout_failures': 0,
+            'checkout_timeouts': 0,
+            'pools_cleared': 0
+        }
+    
+    def _increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+    
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            counters = dict(self.counters)
+        counters['connections_open'] = counters['connections_created'] - counters['connections_closed']
+        return counters
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        self._increment('pools_cleared')
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        self._increment('connections_created')
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        self._increment('connections_closed')
+    
+    def connection_check_out_started(self, event):
+        pass
+    
+    def connection_check_out_failed(self, event):
+        self._increment('checkout_failures')
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            self._increment('checkout_timeouts')
+    
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.counters['connections_checked_out'] += 1
+            self.counters['checkouts_total'] += 1
+    
+    def connection_checked_in(self, event):
+        self._increment('connections_checked_out', -1)
+
+class DatabaseProvider:
+    # Application-scoped MongoDB client shared by every router
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db: Optional[AsyncIOMotorDatabase] = None
+        self.pool_listener = PoolMetricsListener()
+        self.pool_options: Dict[str, Any] = {}
+        # Multi-document transactions need a replica set or sharded cluster; detected in warm_up()
+        self.transactions_supported = False
+    
+    def connect(self) -> AsyncIOMotorDatabase:
+        """Create the shared client from environment settings (idempotent)."""
+        if self.db is not None:
+            return self.db
+        
+        self.pool_options = {
+            'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', '100')),
+            'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', '10')),
+            'waitQueueTimeoutMS': int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000')),
+            'maxIdleTimeMS': int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000')),
+            'connectTimeoutMS': int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+            'serverSelectionTimeoutMS': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+        }
+        
+        self.client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'],
+            event_listeners=[self.pool_listener],
+            **self.pool_options
+        )
+        self.db = self.client[os.environ.get('DB_NAME', 'app_db')]
+        logger.info(
+            f"MongoDB client created (maxPoolSize={self.pool_options['maxPoolSize']}, "
+            f"minPoolSize={self.pool_options['minPoolSize']}, "
+            f"waitQueueTimeoutMS={self.pool_options['waitQueueTimeoutMS']})"
+        )
+        return self.db
+    
+    async def warm_up(self):
+        """Open minPoolSize connections up front so the first requests don't pay for connects."""
+        if self.db is None:
+            self.connect()
+        
+        connections = max(1, self.pool_options.get('minPoolSize', 1))
+        try:
+            # Concurrent pings force the pool to open one connection per ping
+            await asyncio.gather(*[self.db.command('ping') for _ in range(connections)])
+            logger.info(f"MongoDB pool warmed up with {connections} connections")
+        except Exception as e:
+            logger.error(f"MongoDB pool warm-up failed: {str(e)}")
+        
+        try:
+            hello = await self.db.command('hello')
+            self.transactions_supported = 'setName' in hello or hello.get('msg') == 'isdbgrid'
+        except Exception as e:
+            logger.debug(f"MongoDB topology check failed: {str(e)}")
+            self.transactions_supported = False
+        logger.info(f"MongoDB transactions {'enabled' if self.transactions_supported else 'unavailable (standalone server)'}")
+    
+    def close(self):
+        """Close the shared client."""
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.db = None
+        self.transactions_supported = False
+    
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Return pool settings and connection counters."""
+        return {
+            'connected': self.client is not None,
+            'max_pool_size': self.pool_options.get('maxPoolSize'),
+            'min_pool_size': self.pool_options.get('minPoolSize'),
+            'wait_queue_timeout_ms': self.pool_options.get('waitQueueTimeoutMS'),
+            'transactions_supported': self.transactions_supported,
+            **self.pool_listener.snapshot()
+        }
+
+database = DatabaseProvider()
+
+def get_db() -> AsyncIOMotorDatabase:
+    """FastAPI dependency returning the shared database handle."""
+    if database.db is None:
+        return database.connect()
+    return database.db
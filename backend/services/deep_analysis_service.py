@@ -0,0 +1,175 @@
+from typing import Dict, Any, Optional, Set
+import asyncio
+import logging
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from services.scoring_engine import SCORING_VERSION
+from services.analysis_generator import AnalysisGenerator, TEMPLATE_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Precomputed analyses generated under a different scoring or template version are regenerated
+DEEP_ANALYSIS_VERSION = f"{SCORING_VERSION}.{TEMPLATE_VERSION}"
+
+# Scores a precomputed analysis was written from; a rescore that changes them makes it stale
+SCORE_FIELDS = ('total_score', 'section_scores')
+
+# Field holding the precomputed analysis; never returned to clients before unlock
+PRECOMPUTED_FIELD = 'deep_analysis_precomputed'
+
+# Fields of the unlocked record the unlock response needs
+UNLOCK_PROJECTION = {"_id": 0, "deep_analysis": 1, "total_score": 1, "startup_type": 1}
+
+class DeepAnalysisService:
+    # Generates premium deep analyses ahead of payment so unlocking only flips a flag
+    def __init__(self, analysis_generator: Optional[AnalysisGenerator] = None):
+        self.analysis_generator = analysis_generator or AnalysisGenerator()
+        self._tasks: Set[asyncio.Task] = set()
+        self.counters = {
+            'precomputed': 0,
+            'precompute_skipped': 0,
+            'precompute_errors': 0,
+            'served_precomputed': 0,
+            'generated_on_unlock': 0
+        }
+    
+    def schedule_precompute(self, db: AsyncIOMotorDatabase, evaluation_id: str,
+                            evaluation: Optional[Dict[str, Any]] = None):
+        """Precompute the deep analysis for an evaluation in a background task."""
+        task = asyncio.create_task(self.precompute(db, evaluation_id, evaluation))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def precompute(self, db: AsyncIOMotorDatabase, evaluation_id: str,
+                         evaluation: Optional[Dict[str, Any]] = None) -> bool:
+        """Generate and store the deep analysis unless a current version already exists."""
+        try:
+            if evaluation is None:
+                evaluation = await db.vc_evaluations.find_one({"id": evaluation_id})
+            if not evaluation or evaluation.get('premium_unlocked') or self._current(evaluation) is not None:
+                self.counters['precompute_skipped'] += 1
+                return False
+            
+            content = self._generate(evaluation)
+            
+            # The premium_unlocked filter keeps a late precompute from touching an unlocked record
+            await db.vc_evaluations.update_one(
+                {"id": evaluation_id, "premium_unlocked": False},
+                {
+                    "$set": {
+                        PRECOMPUTED_FIELD: {
+                            "version": self.current_version(),
+                            "scores": {field: evaluation[field] for field in SCORE_FIELDS},
+                            "content": content,
+                            "generated_at": datetime.utcnow()
+                        }
+                    }
+                }
+            )
+            self.counters['precomputed'] += 1
+            return True
+        
+        except Exception as e:
+            self.counters['precompute_errors'] += 1
+            logger.error(f"Deep analysis precompute error for {evaluation_id}: {str(e)}")
+            return False
+    
+    def get_or_generate(self, evaluation: Dict[str, Any]) -> str:
+        """Return the precomputed analysis for an evaluation record, generating it if missing or stale."""
+        content = self._current(evaluation)
+        if content is not None:
+            self.counters['served_precomputed'] += 1
+            return content
+        
+        self.counters['generated_on_unlock'] += 1
+        return self._generate(evaluation)
+    
+    async def unlock(self, db: AsyncIOMotorDatabase, evaluation_id: str, session=None) -> Optional[Dict[str, Any]]:
+        """Atomically mark an evaluation unlocked and attach its deep analysis.
+        
+        Returns the unlocked record (deep_analysis, total_score, startup_type), or None when the
+        evaluation doesn't exist or was already unlocked, so concurrent unlocks can't both win.
+        """
+        unlocked_fields = {"premium_unlocked": True, "premium_unlocked_at": datetime.utcnow()}
+        
+        # Fast path: move a current precomputed analysis into place server-side in one round-trip
+        record = await db.vc_evaluations.find_one_and_update(
+            {
+                "id": evaluation_id,
+                "premium_unlocked": False,
+                f"{PRECOMPUTED_FIELD}.version": self.current_version(),
+                "$expr": {"$and": [
+                    {"$eq": [f"${PRECOMPUTED_FIELD}.scores.{field}", f"${field}"]} for field in SCORE_FIELDS
+                ]}
+            },
+            [
+                {"$set": {**unlocked_fields, "deep_analysis": f"${PRECOMPUTED_FIELD}.content"}},
+                {"$unset": PRECOMPUTED_FIELD}
+            ],
+            projection=UNLOCK_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+            session=session
+        )
+        if record is not None:
+            self.counters['served_precomputed'] += 1
+            return record
+        
+        # No current precomputed analysis: generate one, then claim the record conditionally
+        evaluation = await db.vc_evaluations.find_one(
+            {"id": evaluation_id, "premium_unlocked": False}, session=session
+        )
+        if evaluation is None:
+            return None
+        deep_analysis = self.get_or_generate(evaluation)
+        
+        return await db.vc_evaluations.find_one_and_update(
+            {"id": evaluation_id, "premium_unlocked": False},
+            {"$set": {**unlocked_fields, "deep_analysis": deep_analysis}, "$unset": {PRECOMPUTED_FIELD: ""}},
+            projection=UNLOCK_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+            session=session
+        )
+    
+    async def drain(self, timeout_seconds: float = 5):
+        """Wait briefly for in-flight precomputes, then cancel the rest."""
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout_seconds)
+        for task in pending:
+            task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return precompute counters."""
+        return {
+            'version': self.current_version(),
+            'in_flight': len(self._tasks),
+            **self.counters
+        }
+    
+    def current_version(self) -> str:
+        """Freshness key for precomputed analyses: code versions plus the rules version in effect."""
+        return f"{DEEP_ANALYSIS_VERSION}.{self.analysis_generator.rules.version}"
+    
+    def _current(self, evaluation: Dict[str, Any]) -> Optional[str]:
+        precomputed = evaluation.get(PRECOMPUTED_FIELD)
+        if not precomputed or precomputed.get('version') != self.current_version():
+            return None
+        # Written from other scores (e.g. before a rescore), it describes the wrong verdict
+        if precomputed.get('scores') != {field: evaluation.get(field) for field in SCORE_FIELDS}:
+            return None
+        return precomputed.get('content')
+    
+    def _generate(self, evaluation: Dict[str, Any]) -> str:
+        return self.analysis_generator.generate_deep_analysis(
+            evaluation['total_score'],
+            evaluation['section_scores'],
+            evaluation['form_data'],
+            evaluation['startup_type'],
+            evaluated_at=evaluation.get('created_at')
+        )
+
+deep_analysis_service = DeepAnalysisService()
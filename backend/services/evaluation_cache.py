@@ -0,0 +1,42 @@
+from typing import Dict, Any, Optional, Tuple
+import os
+
+from services.cache import TTLCache
+from services.shared_cache import shared_cache
+
+class EvaluationCache:
+    # GET /evaluation/{id} ETags and response bodies by evaluation id; every unlock path invalidates its entry.
+    # With SHARED_CACHE_URL the shared cache is used instead, so every worker sees the invalidation
+    def __init__(self, maxsize: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.cache = TTLCache(
+            maxsize=maxsize or int(os.getenv('EVALUATION_CACHE_SIZE', '4096')),
+            ttl_seconds=ttl_seconds or float(os.getenv('EVALUATION_CACHE_TTL_SECONDS', '10'))
+        )
+    
+    async def get(self, evaluation_id: str) -> Optional[Tuple[str, bytes]]:
+        """Return the cached (etag, body), or None on a miss."""
+        if not shared_cache.enabled:
+            return self.cache.get(evaluation_id)
+        entry = await shared_cache.get(f"evaluation:{evaluation_id}")
+        if entry is None:
+            return None
+        etag, _, body = entry.partition(b'\n')
+        return etag.decode(), body
+    
+    async def set(self, evaluation_id: str, cached: Tuple[str, bytes]):
+        if not shared_cache.enabled:
+            self.cache.set(evaluation_id, cached)
+            return
+        etag, body = cached
+        await shared_cache.set(f"evaluation:{evaluation_id}", etag.encode() + b'\n' + body, self.cache.ttl_seconds)
+    
+    async def invalidate(self, evaluation_id: str):
+        """Drop the entry locally and in the shared cache, e.g. after an unlock changed the record."""
+        self.cache.pop(evaluation_id)
+        await shared_cache.delete(f"evaluation:{evaluation_id}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit rate."""
+        return self.cache.stats()
+
+evaluation_cache = EvaluationCache()
@@ -0,0 +1,189 @@
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
+import os
+import copy
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+import orjson
+
+from services.cache import TTLCache, content_hash
+from services.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+# A reservation whose request never finished (crashed worker) stops blocking retries after this long
+IN_PROGRESS_TTL_SECONDS = 60
+
+class IdempotencyError(Exception):
+    # Raised when a key can't be honoured; routes turn it into an HTTP error
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+class IdempotencyStore:
+    # Stored responses by Idempotency-Key: an in-process LRU and the optional shared cache in front of a TTL'd collection
+    def __init__(self, collection_name: str = 'idempotency_keys', ttl_seconds: Optional[int] = None,
+                 local_cache_size: Optional[int] = None):
+        self.collection_name = collection_name
+        self.ttl_seconds = ttl_seconds or int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+        self.local = TTLCache(
+            maxsize=local_cache_size or int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '10000')),
+            ttl_seconds=self.ttl_seconds
+        )
+        # Requests of this process still executing, so same-process retries wait instead of conflicting
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.counters = {
+            'executed': 0,
+            'replayed': 0,
+            'replayed_locally': 0,
+            'replayed_shared': 0,
+            'conflicts': 0,
+            'errors': 0
+        }
+    
+    def index_plan(self) -> Dict[str, List[IndexModel]]:
+        """TTL index that drops stored responses once they expire."""
+        return {
+            self.collection_name: [
+                IndexModel([("expires_at", ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0)
+            ]
+        }
+    
+    async def run(self, db: AsyncIOMotorDatabase, scope: str, key: Optional[str], payload: Any,
+                  execute: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+        """Execute once per (scope, key) and replay the stored response for repeats.
+        
+        Returns ``(response, replayed)``. Without a key this just executes. Failed executions
+        are not stored, so the client can retry them. Raises IdempotencyError when the key was
+        used with a different payload or its first request is still running in another process.
+        """
+        if not key:
+            return await execute(), False
+        if len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyError(400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+        
+        record_id = f"{scope}:{key}"
+        fingerprint = content_hash(payload)
+        
+        stored = self.local.get(record_id)
+        if stored is None and record_id in self._in_flight:
+            stored = await asyncio.shield(self._in_flight[record_id])
+        if stored is not None:
+            self.counters['replayed_locally'] += 1
+            return self._replay(stored, fingerprint), True
+        
+        # Completed by another worker: replay without touching Mongo (which stays the source of truth)
+        stored = await self._load_shared(record_id)
+        if stored is not None:
+            self.local.set(record_id, stored)
+            self.counters['replayed_shared'] += 1
+            return self._replay(stored, fingerprint), True
+        
+        try:
+            reserved = await self._reserve(db, record_id, fingerprint)
+        except Exception as e:
+            # Fail open: losing idempotency beats failing the request
+            self.counters['errors'] += 1
+            logger.error(f"Idempotency store error: {str(e)}")
+            return await execute(), False
+        
+        if not reserved:
+            existing = await db[self.collection_name].find_one({"_id": record_id})
+            if existing is not None and existing.get('status') == 'completed':
+                stored = {'fingerprint': existing['fingerprint'], 'response': existing['response']}
+                self.local.set(record_id, stored)
+                self.counters['replayed'] += 1
+                return self._replay(stored, fingerprint), True
+            self.counters['conflicts'] += 1
+            if existing is not None and existing['fingerprint'] != fingerprint:
+                raise IdempotencyError(422, "Idempotency-Key was already used with a different request")
+            raise IdempotencyError(409, "A request with this Idempotency-Key is already in progress")
+        
+        return await self._execute(db, record_id, fingerprint, execute), False
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return store settings and counters."""
+        return {
+            'ttl_seconds': self.ttl_seconds,
+            'cached_responses': len(self.local),
+            'in_flight': len(self._in_flight),
+            **self.counters
+        }
+    
+    async def _reserve(self, db: AsyncIOMotorDatabase, record_id: str, fingerprint: str) -> bool:
+        """Claim the key; False when another request already holds or completed it."""
+        now = datetime.utcnow()
+        try:
+            await db[self.collection_name].insert_one({
+                "_id": record_id,
+                "fingerprint": fingerprint,
+                "status": "in_progress",
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=IN_PROGRESS_TTL_SECONDS)
+            })
+        except DuplicateKeyError:
+            return False
+        return True
+    
+    async def _execute(self, db: AsyncIOMotorDatabase, record_id: str, fingerprint: str,
+                       execute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        completed = asyncio.get_running_loop().create_future()
+        self._in_flight[record_id] = completed
+        try:
+            response = await execute()
+        except BaseException:
+            # Release the key so the client's retry executes again; waiters are only woken once it
+            # is gone, otherwise their retry finds the reservation and is rejected as in progress
+            try:
+                await db[self.collection_name].delete_one({"_id": record_id, "status": "in_progress"})
+            except Exception as e:
+                logger.error(f"Idempotency key release failed: {str(e)}")
+            self._in_flight.pop(record_id, None)
+            completed.set_result(None)
+            raise
+        finally:
+            self._in_flight.pop(record_id, None)
+        
+        stored = {'fingerprint': fingerprint, 'response': copy.deepcopy(response)}
+        self.local.set(record_id, stored)
+        completed.set_result(stored)
+        self.counters['executed'] += 1
+        await shared_cache.set(f"idempotency:{record_id}", orjson.dumps(stored), self.ttl_seconds)
+        
+        try:
+            await db[self.collection_name].update_one(
+                {"_id": record_id},
+                {
+                    "$set": {
+                        "status": "completed",
+                        "response": stored['response'],
+                        "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+                    }
+                }
+            )
+        except Exception as e:
+            # This process still replays from its LRU; other processes see the reservation expire
+            self.counters['errors'] += 1
+            logger.error(f"Storing idempotent response failed: {str(e)}")
+        return response
+    
+    async def _load_shared(self, record_id: str) -> Optional[Dict[str, Any]]:
+        if not shared_cache.enabled:
+            return None
+        body = await shared_cache.get(f"idempotency:{record_id}")
+        return orjson.loads(body) if body is not None else None
+    
+    def _replay(self, stored: Dict[str, Any], fingerprint: str) -> Dict[str, Any]:
+        if stored['fingerprint'] != fingerprint:
+            self.counters['conflicts'] += 1
+            raise IdempotencyError(422, "Idempotency-Key was already used with a different request")
+        return copy.deepcopy(stored['response'])
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,140 @@
+from typing import Dict, Any, List, Optional
+import os
+import asyncio
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+IndexPlan = Dict[str, List[IndexModel]]
+
+# Indexes owned by the core collections; services add their own (TTL) indexes via index_plan()
+CORE_INDEX_PLAN: IndexPlan = {
+    'vc_evaluations': [
+        IndexModel([('id', ASCENDING)], name='id_unique', unique=True),
+        # Per-user lookups ordered by time; also serves plain user_uuid queries
+        IndexModel([('user_uuid', ASCENDING), ('created_at', ASCENDING)], name='user_uuid_created_at')
+    ],
+    'payment_records': [
+        IndexModel([('stripe_payment_intent_id', ASCENDING)], name='stripe_payment_intent_id_unique', unique=True),
+        IndexModel([('evaluation_id', ASCENDING)], name='evaluation_id')
+    ]
+}
+
+# Options that make two indexes on the same keys different
+_COMPARED_OPTIONS = ('unique', 'expireAfterSeconds', 'sparse', 'partialFilterExpression')
+
+def build_index_plan(*plans: IndexPlan) -> IndexPlan:
+    """Merge per-service index plans into one plan keyed by collection."""
+    merged: IndexPlan = {}
+    for plan in plans:
+        for collection, models in plan.items():
+            merged.setdefault(collection, []).extend(models)
+    return merged
+
+async def apply_index_plan(db: AsyncIOMotorDatabase, plan: IndexPlan, migrate: Optional[bool] = None) -> Dict[str, Any]:
+    """Create the planned indexes (collections in parallel) and report how the live set differs.
+    
+    With ``migrate`` (MONGO_INDEX_MIGRATE=true), indexes that conflict with the plan or are no
+    longer part of it are dropped first, so e.g. a legacy non-unique ``id_1`` becomes ``id_unique``.
+    """
+    if migrate is None:
+        migrate = os.getenv('MONGO_INDEX_MIGRATE', 'false').lower() == 'true'
+    
+    if migrate:
+        before = await verify_index_plan(db, plan)
+        await asyncio.gather(*[
+            _drop_indexes(db, collection, list(dict.fromkeys(
+                index['name'] for index in before[collection]['conflicting'] + before[collection]['redundant']
+            )))
+            for collection in plan
+        ])
+    
+    results = await asyncio.gather(*[
+        db[collection].create_indexes(models) for collection, models in plan.items()
+    ], return_exceptions=True)
+    for collection, result in zip(plan, results):
+        if isinstance(result, Exception):
+            logger.error(f"Creating indexes on {collection} failed: {str(result)}")
+    
+    report = await verify_index_plan(db, plan)
+    for collection, entry in report.items():
+        if entry['missing'] or entry['conflicting']:
+            logger.error(f"Index plan not satisfied on {collection}: missing={entry['missing']}, "
+                         f"conflicting={[index['name'] for index in entry['conflicting']]}")
+        if entry['redundant']:
+            logger.warning(f"Redundant indexes on {collection}: {[index['name'] for index in entry['redundant']]} "
+                           f"(set MONGO_INDEX_MIGRATE=true to drop them)")
+    return report
+
+async def verify_index_plan(db: AsyncIOMotorDatabase, plan: IndexPlan) -> Dict[str, Any]:
+    """Compare the live indexes of each planned collection against the plan."""
+    live = await asyncio.gather(*[_live_indexes(db, collection) for collection in plan])
+    report = {}
+    
+    for (collection, models), existing in zip(plan.items(), live):
+        planned = [model.document for model in models]
+        missing, conflicting = [], []
+        matched_names = set()
+        
+        for spec in planned:
+            key = list(spec['key'].items())
+            same_keys = [index for index in existing if list(index['key'].items()) == key]
+            exact = [index for index in same_keys if _options(index) == _options(spec)]
+            if exact:
+                matched_names.update(index['name'] for index in exact)
+                continue
+            missing.append(spec['name'])
+            # Same keys or same name with other options blocks creation until dropped
+            clashes = same_keys + [index for index in existing if index['name'] == spec['name'] and index not in same_keys]
+            conflicting.extend({'name': index['name'], 'key': dict(index['key']), **_options(index)} for index in clashes)
+            matched_names.update(index['name'] for index in clashes)
+        
+        redundant = [
+            {'name': index['name'], 'key': dict(index['key']), **_options(index)}
+            for index in existing
+            if index['name'] != '_id_' and index['name'] not in matched_names
+        ]
+        report[collection] = {
+            'planned': [spec['name'] for spec in planned],
+            'missing': missing,
+            'conflicting': conflicting,
+            'redundant': redundant
+        }
+    return report
+
+def summarize_index_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Collections whose live indexes differ from the plan, by index name."""
+    return {
+        collection: {
+            'missing': entry['missing'],
+            'conflicting': [index['name'] for index in entry['conflicting']],
+            'redundant': [index['name'] for index in entry['redundant']]
+        }
+        for collection, entry in report.items()
+        if entry['missing'] or entry['conflicting'] or entry['redundant']
+    }
+
+async def _live_indexes(db: AsyncIOMotorDatabase, collection: str) -> List[Dict[str, Any]]:
+    try:
+        return [index async for index in db[collection].list_indexes()]
+    except Exception as e:
+        # A collection that doesn't exist yet has no indexes
+        logger.debug(f"Listing indexes on {collection} failed: {str(e)}")
+        return []
+
+async def _drop_indexes(db: AsyncIOMotorDatabase, collection: str, names: List[str]):
+    for name in names:
+        try:
+            await db[collection].drop_index(name)
+            logger.info(f"Dropped index {name} on {collection}")
+        except Exception as e:
+            logger.error(f"Dropping index {name} on {collection} failed: {str(e)}")
+
+def _options(index: Dict[str, Any]) -> Dict[str, Any]:
+    options = {name: index[name] for name in _COMPARED_OPTIONS if index.get(name) not in (None, False)}
+    if 'expireAfterSeconds' in options:
+        options['expireAfterSeconds'] = int(options['expireAfterSeconds'])
+    return options
@@ -0,0 +1,198 @@
+from typing import Dict, Any, List, Tuple, Callable, Optional
+import os
+import re
+import time
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow Stripe calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_METRIC_NAME_PATTERN = re.compile(r'[^a-zA-Z0-9_]')
+
+# Stage timings of the current request, collected for the Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('request_timings', default=None)
+
+class Histogram:
+    # Cumulative-bucket histogram in the Prometheus data model
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+    
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+class _Span:
+    __slots__ = ('registry', 'stage', 'started')
+    
+    def __init__(self, registry: 'MetricsRegistry', stage: str):
+        self.registry = registry
+        self.stage = stage
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe_stage(self.stage, time.perf_counter() - self.started)
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+class MetricsRegistry:
+    # In-process stage and request histograms exported in Prometheus text format
+    def __init__(self, enabled: Optional[bool] = None, server_timing: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+        if server_timing is None:
+            server_timing = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+        self.enabled = enabled
+        self.server_timing = enabled and server_timing
+        self.stage_histograms: Dict[str, Histogram] = {}
+        self.request_histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self.collectors: List[Tuple[str, Callable[[], Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+    
+    def span(self, stage: str):
+        """Time a block of work as ``stage``; a shared no-op when metrics are disabled."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, stage)
+    
+    def observe_stage(self, stage: str, seconds: float):
+        """Record one stage duration and attach it to the current request's Server-Timing."""
+        histogram = self.stage_histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stage_histograms.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+        
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, seconds))
+    
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        """Record one request duration by method, route template and status code."""
+        key = (method, route, str(status))
+        histogram = self.request_histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.request_histograms.setdefault(key, Histogram())
+        histogram.observe(seconds)
+    
+    def register_collector(self, prefix: str, collect: Callable[[], Dict[str, Any]]):
+        """Export the numeric values of a stats() dict as gauges named vc_<prefix>_<key>."""
+        self.collectors.append((prefix, collect))
+    
+    def render_prometheus(self) -> str:
+        """Render every histogram and collector in the Prometheus text exposition format."""
+        lines = []
+        
+        lines.append("# HELP vc_stage_duration_seconds Duration of instrumented request stages.")
+        lines.append("# TYPE vc_stage_duration_seconds histogram")
+        for stage, histogram in sorted(self.stage_histograms.items()):
+            self._render_histogram(lines, 'vc_stage_duration_seconds', {'stage': stage}, histogram)
+        
+        lines.append("# HELP vc_http_request_duration_seconds Duration of HTTP requests.")
+        lines.append("# TYPE vc_http_request_duration_seconds histogram")
+        for (method, route, status), histogram in sorted(self.request_histograms.items()):
+            labels = {'method': method, 'route': route, 'status': status}
+            self._render_histogram(lines, 'vc_http_request_duration_seconds', labels, histogram)
+        
+        for prefix, collect in self.collectors:
+            try:
+                values = _flatten(collect())
+            except Exception:
+                continue
+            for key, value in values:
+                name = _METRIC_NAME_PATTERN.sub('_', f"vc_{prefix}_{key}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def _render_histogram(self, lines: List[str], name: str, labels: Dict[str, str], histogram: Histogram):
+        counts, total, count = histogram.snapshot()
+        label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {count}')
+        lines.append(f'{name}_sum{{{label_text}}} {total}')
+        lines.append(f'{name}_count{{{label_text}}} {count}')
+
+class MetricsMiddleware:
+    # Pure ASGI middleware: times each HTTP request and optionally emits Server-Timing
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        status = 500
+        
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if self.registry.server_timing:
+                    entries = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings]
+                    entries.append(f"total;dur={(time.perf_counter() - started) * 1000:.2f}")
+                    headers = list(message.get('headers', []))
+                    headers.append((b'server-timing', ", ".join(entries).encode()))
+                    message = {**message, 'headers': headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            # Route templates keep label cardinality bounded (/evaluation/{evaluation_id}, not every id)
+            route = scope.get('route')
+            route_path = getattr(route, 'path', None) or 'unmatched'
+            self.registry.observe_request(scope['method'], route_path, status, time.perf_counter() - started)
+
+def _flatten(values: Dict[str, Any], prefix: str = '') -> List[Tuple[str, float]]:
+    flat = []
+    for key, value in values.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.extend(_flatten(value, f"{name}_"))
+        elif isinstance(value, bool):
+            flat.append((name, int(value)))
+        elif isinstance(value, (int, float)):
+            flat.append((name, value))
+    return flat
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+metrics = MetricsRegistry()
@@ -1,30 +1,55 @@
 import os
-import stripe
+import threading
 from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# The Stripe SDK is slow to import, so it is loaded by PaymentService.load_sdk() and never in mock mode
+stripe = None
+_sdk_lock = threading.Lock()
+
 class PaymentService:
     def __init__(self):
         # Use test keys for development
-        stripe.api_key = os.getenv('STRIPE_SECRET_KEY', 'sk_test_mock_key')
+        self.secret_key = os.getenv('STRIPE_SECRET_KEY', 'sk_test_mock_key')
         self.publishable_key = os.getenv('STRIPE_PUBLISHABLE_KEY', 'pk_test_mock_key')
         self.webhook_secret = os.getenv('STRIPE_WEBHOOK_SECRET', 'whsec_mock_secret')
         
         # For demo purposes, we'll mock Stripe functionality if no real keys are provided
-        self.is_mock_mode = stripe.api_key == 'sk_test_mock_key'
+        self.is_mock_mode = self.secret_key == 'sk_test_mock_key'
         
         if self.is_mock_mode:
             logger.info("Payment service running in MOCK mode - no real payments will be processed")
     
-    def create_payment_intent(self, evaluation_id: str, amount: int = 999, currency: str = 'usd') -> Dict[str, Any]:
+    def load_sdk(self):
+        """Import and configure the Stripe SDK once; called at startup and before every real Stripe call."""
+        global stripe
+        if stripe is not None:
+            return stripe
+        
+        with _sdk_lock:
+            if stripe is None:
+                import stripe as sdk
+                sdk.api_key = self.secret_key
+                # Bound every Stripe round-trip; STRIPE_API_BASE points the SDK at a local fake server for load tests
+                sdk.api_base = os.getenv('STRIPE_API_BASE', sdk.api_base)
+                sdk.max_network_retries = int(os.getenv('STRIPE_MAX_NETWORK_RETRIES', '1'))
+                sdk.default_http_client = sdk.new_default_http_client(
+                    timeout=float(os.getenv('STRIPE_TIMEOUT_SECONDS', '10'))
+                )
+                stripe = sdk
+        return stripe
+    
+    def create_payment_intent(self, evaluation_id: str, amount: int = 999, currency: str = 'usd',
+                              idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """Create a Stripe payment intent for premium unlock."""
+        if self.is_mock_mode:
+            return self._create_mock_payment_intent(evaluation_id, amount, currency)
+        self.load_sdk()
+        
         try:
-            if self.is_mock_mode:
-                return self._create_mock_payment_intent(evaluation_id, amount, currency)
-            
             # Real Stripe integration
             intent = stripe.PaymentIntent.create(
                 amount=amount,
@@ -33,7 +58,9 @@ class PaymentService:
                     'evaluation_id': evaluation_id,
                     'product': 'vc_test_premium_analysis'
                 },
-                description=f'VC Test Premium Analysis - Evaluation {evaluation_id[:8]}'
+                description=f'VC Test Premium Analysis - Evaluation {evaluation_id[:8]}',
+                # Stripe deduplicates retried creates that carry the same key
+                idempotency_key=idempotency_key
             )
             
             return {
@@ -43,7 +70,7 @@ class PaymentService:
                 'amount': amount,
                 'currency': currency
             }
-            
+        
         except stripe.error.StripeError as e:
             logger.error(f"Stripe error creating payment intent: {str(e)}")
             return {
@@ -74,21 +101,16 @@ class PaymentService:
     
     def verify_payment(self, payment_intent_id: str) -> Dict[str, Any]:
         """Verify that a payment was successful."""
+        if self.is_mock_mode:
+            return self._verify_mock_payment(payment_intent_id)
+        self.load_sdk()
+        
         try:
-            if self.is_mock_mode:
-                return self._verify_mock_payment(payment_intent_id)
-            
             # Real Stripe verification
             intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             
-            return {
-                'success': True,
-                'status': intent.status,
-                'amount': intent.amount,
-                'currency': intent.currency,
-                'metadata': intent.metadata
-            }
-            
+            return self._verification_result(intent)
+        
         except stripe.error.StripeError as e:
             logger.error(f"Stripe error verifying payment: {str(e)}")
             return {
@@ -118,29 +140,45 @@ class PaymentService:
     
     def handle_webhook(self, payload: str, signature: str) -> Dict[str, Any]:
         """Handle Stripe webhook events."""
+        if self.is_mock_mode:
+            return {'success': True, 'mock_mode': True}
+        self.load_sdk()
+        
         try:
-            if self.is_mock_mode:
-                return {'success': True, 'mock_mode': True}
-            
             event = stripe.Webhook.construct_event(
                 payload, signature, self.webhook_secret
             )
             
             if event['type'] == 'payment_intent.succeeded':
                 payment_intent = event['data']['object']
-                evaluation_id = payment_intent['metadata'].get('evaluation_id')
+                verification = self._verification_result(payment_intent)
+                evaluation_id = verification['metadata'].get('evaluation_id')
                 
-                # Here you would update the database to mark the evaluation as premium unlocked
+                # The evaluation is unlocked by the webhook inbox consumers, not on the request path
                 logger.info(f"Payment succeeded for evaluation {evaluation_id}")
                 
                 return {
                     'success': True,
+                    'event_id': event['id'],
                     'event_type': event['type'],
-                    'evaluation_id': evaluation_id
+                    'evaluation_id': evaluation_id,
+                    # Lets the verification cache answer the unlock without retrieving the intent
+                    'payment_intent_id': payment_intent['id'],
+                    'verification': verification
                 }
             
-            return {'success': True, 'event_type': event['type']}
+            if event['type'] == 'payment_intent.canceled':
+                payment_intent = event['data']['object']
+                return {
+                    'success': True,
+                    'event_id': event['id'],
+                    'event_type': event['type'],
+                    'payment_intent_id': payment_intent['id'],
+                    'verification': self._verification_result(payment_intent)
+                }
             
+            return {'success': True, 'event_id': event['id'], 'event_type': event['type']}
+        
         except ValueError as e:
             logger.error(f"Invalid payload in webhook: {str(e)}")
             return {'success': False, 'error': 'Invalid payload'}
@@ -151,6 +189,18 @@ class PaymentService:
             logger.error(f"Unexpected webhook error: {str(e)}")
             return {'success': False, 'error': 'Internal server error'}
     
+    def _verification_result(self, intent) -> Dict[str, Any]:
+        """Build the verify_payment result from a PaymentIntent (retrieved or from a webhook event)."""
+        metadata = intent['metadata']
+        return {
+            'success': True,
+            'status': intent['status'],
+            'amount': intent['amount'],
+            'currency': intent['currency'],
+            # StripeObject is only dict-like on older SDKs
+            'metadata': metadata.to_dict() if hasattr(metadata, 'to_dict') else dict(metadata or {})
+        }
+    
     def get_publishable_key(self) -> str:
         """Get the Stripe publishable key for frontend."""
         return self.publishable_key
@@ -0,0 +1,88 @@
+from typing import Dict, Any, Optional
+import os
+import copy
+
+import orjson
+
+from services.cache import TTLCache
+from services.shared_cache import shared_cache
+
+# PaymentIntent statuses that never change again
+TERMINAL_STATUSES = frozenset({'succeeded', 'canceled'})
+
+class PaymentVerificationCache:
+    # verify_payment results by payment intent id; terminal statuses stay until evicted
+    def __init__(self, maxsize: Optional[int] = None, pending_ttl_seconds: Optional[float] = None,
+                 shared_ttl_seconds: Optional[float] = None):
+        self.pending_ttl_seconds = pending_ttl_seconds or float(os.getenv('PAYMENT_VERIFICATION_TTL_SECONDS', '5'))
+        # How long other workers can still find a terminal result in the shared cache
+        self.shared_ttl_seconds = shared_ttl_seconds or float(os.getenv('PAYMENT_VERIFICATION_SHARED_TTL_SECONDS', '86400'))
+        self.cache = TTLCache(
+            maxsize=maxsize or int(os.getenv('PAYMENT_VERIFICATION_CACHE_SIZE', '10000')),
+            ttl_seconds=self.pending_ttl_seconds
+        )
+        self.counters = {
+            'stored_terminal': 0,
+            'stored_pending': 0,
+            'stored_from_webhook': 0,
+            'shared_hits': 0
+        }
+    
+    def get(self, payment_intent_id: str) -> Optional[Dict[str, Any]]:
+        verification = self.cache.get(payment_intent_id)
+        return copy.deepcopy(verification) if verification is not None else None
+    
+    def store(self, payment_intent_id: str, verification: Dict[str, Any], from_webhook: bool = False) -> bool:
+        """Cache a successful verification; failed lookups are never cached."""
+        if not payment_intent_id or not verification.get('success'):
+            return False
+        
+        terminal = verification.get('status') in TERMINAL_STATUSES
+        if not terminal:
+            # Webhooks can arrive out of order; a terminal status is never replaced by an older one
+            current = self.cache.get(payment_intent_id)
+            if current is not None and current.get('status') in TERMINAL_STATUSES:
+                return False
+        
+        self.cache.set(payment_intent_id, copy.deepcopy(verification),
+                       ttl_seconds=None if terminal else self.pending_ttl_seconds)
+        self.counters['stored_terminal' if terminal else 'stored_pending'] += 1
+        if from_webhook:
+            self.counters['stored_from_webhook'] += 1
+        return True
+    
+    async def fetch(self, payment_intent_id: str) -> Optional[Dict[str, Any]]:
+        """Like get(), then falling back to what other workers stored in the shared cache."""
+        verification = self.get(payment_intent_id)
+        if verification is not None or not shared_cache.enabled:
+            return verification
+        
+        body = await shared_cache.get(f"payment_verification:{payment_intent_id}")
+        if body is None:
+            return None
+        verification = orjson.loads(body)
+        self.store(payment_intent_id, verification)
+        self.counters['shared_hits'] += 1
+        return verification
+    
+    async def save(self, payment_intent_id: str, verification: Dict[str, Any], from_webhook: bool = False):
+        """Like store(), and share the result with other workers."""
+        if not self.store(payment_intent_id, verification, from_webhook) or not shared_cache.enabled:
+            return
+        
+        terminal = verification.get('status') in TERMINAL_STATUSES
+        # A pending result never overwrites one another worker stored; a terminal one always wins
+        await shared_cache.set(
+            f"payment_verification:{payment_intent_id}", orjson.dumps(verification),
+            self.shared_ttl_seconds if terminal else self.pending_ttl_seconds, only_if_absent=not terminal
+        )
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size, hit rate and counters."""
+        return {
+            'pending_ttl_seconds': self.pending_ttl_seconds,
+            **self.cache.stats(),
+            **self.counters
+        }
+
+payment_verification_cache = PaymentVerificationCache()
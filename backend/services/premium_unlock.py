@@ -0,0 +1,77 @@
+from typing import Dict, Any, Optional
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from models.vc_models import PaymentRecord
+from services.database import database
+from services.deep_analysis_service import deep_analysis_service, UNLOCK_PROJECTION
+from services.evaluation_cache import evaluation_cache
+
+logger = logging.getLogger(__name__)
+
+async def unlock_and_record_payment(db: AsyncIOMotorDatabase, evaluation_id: str,
+                                    payment_record: PaymentRecord) -> Optional[Dict[str, Any]]:
+    """Unlock an evaluation and upsert its payment record, atomically when transactions are available.
+    
+    Returns the unlocked record, or None when the evaluation is missing or was already unlocked.
+    """
+    if database.transactions_supported:
+        async def unlock_in_transaction(session):
+            record = await deep_analysis_service.unlock(db, evaluation_id, session=session)
+            if record is None:
+                # Nothing was unlocked, so there is no payment to record
+                await session.abort_transaction()
+                return None
+            await upsert_payment_record(db, payment_record, session=session)
+            return record
+        
+        async with await db.client.start_session() as session:
+            return await session.with_transaction(unlock_in_transaction)
+    
+    # Standalone server: record the payment only once the unlock has claimed the evaluation
+    record = await deep_analysis_service.unlock(db, evaluation_id)
+    if record is not None:
+        await upsert_payment_record(db, payment_record)
+    return record
+
+async def upsert_payment_record(db: AsyncIOMotorDatabase, payment_record: PaymentRecord, session=None):
+    """Insert the payment record once per payment intent; repeats are no-ops."""
+    document = payment_record.dict()
+    payment_intent_id = document.pop('stripe_payment_intent_id')
+    await db.payment_records.update_one(
+        {"stripe_payment_intent_id": payment_intent_id},
+        {"$setOnInsert": document},
+        upsert=True,
+        session=session
+    )
+
+async def find_unlocked_by_payment(db: AsyncIOMotorDatabase, evaluation_id: str,
+                                   payment_intent_id: str) -> Optional[Dict[str, Any]]:
+    """Return the evaluation if this payment intent already unlocked it (e.g. via the webhook)."""
+    payment = await db.payment_records.find_one(
+        {"stripe_payment_intent_id": payment_intent_id, "evaluation_id": evaluation_id}, {"_id": 1}
+    )
+    if payment is None:
+        return None
+    return await db.vc_evaluations.find_one({"id": evaluation_id, "premium_unlocked": True}, UNLOCK_PROJECTION)
+
+async def process_payment_succeeded(db: AsyncIOMotorDatabase, event: Dict[str, Any]):
+    """Webhook job for payment_intent.succeeded: unlock the paid evaluation and record the payment."""
+    verification = event['data']['verification']
+    evaluation_id = verification['metadata'].get('evaluation_id')
+    if not evaluation_id:
+        logger.warning(f"Payment {event['data']['payment_intent_id']} has no evaluation_id; nothing to unlock")
+        return
+    
+    payment_record = PaymentRecord(
+        evaluation_id=evaluation_id,
+        stripe_payment_intent_id=event['data']['payment_intent_id'],
+        amount=verification.get('amount', 999),
+        currency=verification.get('currency', 'usd'),
+        status='succeeded'
+    )
+    record = await unlock_and_record_payment(db, evaluation_id, payment_record)
+    if record is not None:
+        await evaluation_cache.invalidate(evaluation_id)
+        logger.info(f"Payment succeeded; evaluation {evaluation_id} unlocked")
@@ -0,0 +1,159 @@
+from typing import Dict, Any, Optional
+import os
+import sys
+import random
+import threading
+import time
+from collections import Counter
+
+# Only requests under these prefixes are eligible for sampling
+PROFILED_PREFIXES = ('/api/vc-test/', '/api/payments/')
+
+class SamplingProfiler:
+    # Low-overhead stack sampler that runs only while a sampled request is in flight. It samples only
+    # the event-loop threads serving sampled requests, not the rest of the process; other requests on
+    # the same loop still show up, and work handed to executor threads does not
+    def __init__(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None,
+                 interval_ms: Optional[float] = None, max_stacks: int = 5000, max_depth: int = 64):
+        if enabled is None:
+            enabled = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+        self.enabled = enabled
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv('PROFILER_SAMPLE_RATE', '0.01'))
+        self.interval_ms = interval_ms or float(os.getenv('PROFILER_INTERVAL_MS', '5'))
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sampled_requests = 0
+        self.dropped_stacks = 0
+        self.started_at = time.time()
+        
+        self._active = 0
+        # Event-loop thread ident -> sampled requests in flight on it
+        self._request_threads: Counter = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def configure(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None,
+                  interval_ms: Optional[float] = None):
+        """Change profiling settings at runtime."""
+        if sample_rate is not None:
+            if not 0 <= sample_rate <= 1:
+                raise ValueError("sample_rate must be between 0 and 1")
+            self.sample_rate = sample_rate
+        if interval_ms is not None:
+            if interval_ms <= 0:
+                raise ValueError("interval_ms must be positive")
+            self.interval_ms = interval_ms
+        if enabled is not None:
+            self.enabled = enabled
+    
+    def should_sample(self, path: str) -> bool:
+        return self.enabled and path.startswith(PROFILED_PREFIXES) and random.random() < self.sample_rate
+    
+    def request_started(self):
+        """Called on the event-loop thread serving the request; that thread is the one sampled."""
+        with self._lock:
+            self._active += 1
+            self._request_threads[threading.get_ident()] += 1
+            self.sampled_requests += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+                self._thread.start()
+            self._wake.set()
+    
+    def request_finished(self):
+        with self._lock:
+            self._active -= 1
+            ident = threading.get_ident()
+            self._request_threads[ident] -= 1
+            if self._request_threads[ident] <= 0:
+                del self._request_threads[ident]
+            if self._active == 0:
+                self._wake.clear()
+    
+    def collapsed(self) -> str:
+        """Return samples in collapsed-stack format (``frame;frame;frame count``), ready for flamegraph.pl."""
+        with self._lock:
+            items = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+    
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+            self.sampled_requests = 0
+            self.dropped_stacks = 0
+            self.started_at = time.time()
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'interval_ms': self.interval_ms,
+            'active_requests': self._active,
+            'sampled_requests': self.sampled_requests,
+            'samples': self.samples,
+            'distinct_stacks': len(self.stacks),
+            'dropped_stacks': self.dropped_stacks,
+            'collecting_since': self.started_at
+        }
+    
+    def _run(self):
+        """Sampler loop; parks on an event whenever no sampled request is running."""
+        while True:
+            self._wake.wait()
+            self._sample()
+            time.sleep(self.interval_ms / 1000)
+    
+    def _sample(self):
+        with self._lock:
+            idents = list(self._request_threads)
+        if not idents:
+            return
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frames = sys._current_frames()
+        collected = [
+            self._collapse(thread_names.get(ident, str(ident)), frames[ident])
+            for ident in idents if ident in frames
+        ]
+        
+        with self._lock:
+            for stack in collected:
+                if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                    self.stacks[stack] += 1
+                else:
+                    # Bound memory when stacks are very diverse
+                    self.dropped_stacks += 1
+            self.samples += 1
+    
+    def _collapse(self, thread_name: str, frame) -> str:
+        frames = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        frames.append(thread_name.replace(';', '_').replace(' ', '_'))
+        frames.reverse()
+        return ";".join(frames)
+
+class ProfilerMiddleware:
+    # Pure ASGI middleware that marks a sampled fraction of API requests for profiling
+    def __init__(self, app, profiler: SamplingProfiler):
+        self.app = app
+        self.profiler = profiler
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.profiler.should_sample(scope['path']):
+            await self.app(scope, receive, send)
+            return
+        
+        self.profiler.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_finished()
+
+profiler = SamplingProfiler()
@@ -0,0 +1,121 @@
+from typing import Dict, Any, List, Optional
+import os
+import time
+import logging
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from services.cache import TTLCache
+from services.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+class SubmissionRateLimiter:
+    # Fixed-window submission counter per user, stored in the rate_limits collection
+    def __init__(self, limit: int, window_seconds: Optional[int] = None,
+                 collection_name: str = 'rate_limits', local_cache_size: int = 10000):
+        self.limit = limit
+        self.window_seconds = window_seconds or int(os.getenv('RATE_LIMIT_WINDOW_SECONDS', '86400'))
+        self.collection_name = collection_name
+        
+        # Users who exhausted their window; their token bucket stays empty until the window
+        # resets, so repeat requests are rejected without a database round-trip
+        self.exhausted = TTLCache(maxsize=local_cache_size, ttl_seconds=self.window_seconds)
+        self.counters = {
+            'allowed': 0,
+            'rejected': 0,
+            'rejected_locally': 0,
+            'errors': 0
+        }
+    
+    def set_limit(self, limit: int):
+        """Change the per-window limit, e.g. after a rules reload; locally cached rejections are dropped."""
+        if limit == self.limit:
+            return
+        self.limit = limit
+        self.exhausted.clear()
+    
+    def index_plan(self) -> Dict[str, List[IndexModel]]:
+        """TTL index that drops counters once their window has passed."""
+        return {
+            self.collection_name: [
+                IndexModel([("expires_at", ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0)
+            ]
+        }
+    
+    async def hit(self, db: AsyncIOMotorDatabase, user_uuid: str) -> Dict[str, Any]:
+        """Count one submission for user_uuid and report whether it is within the limit."""
+        now = time.time()
+        window_start = int(now // self.window_seconds) * self.window_seconds
+        window_end = window_start + self.window_seconds
+        
+        reset_at = self.exhausted.get(user_uuid)
+        if reset_at is not None and reset_at > now:
+            self.counters['rejected_locally'] += 1
+            return self._result(False, 0, int(reset_at - now) + 1)
+        
+        try:
+            count = await self._increment(db, user_uuid, window_start, window_end)
+        except Exception as e:
+            # Fail open: a counter outage must not take submissions down with it
+            self.counters['errors'] += 1
+            logger.error(f"Rate limiter error: {str(e)}")
+            return self._result(True, 0, 0)
+        
+        if count > self.limit:
+            self.exhausted.set(user_uuid, window_end, ttl_seconds=window_end - now)
+            self.counters['rejected'] += 1
+            return self._result(False, 0, int(window_end - now) + 1)
+        
+        self.counters['allowed'] += 1
+        return self._result(True, self.limit - count, 0)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return limiter settings and counters."""
+        return {
+            'limit': self.limit,
+            'window_seconds': self.window_seconds,
+            'exhausted_users_cached': len(self.exhausted),
+            **self.counters
+        }
+    
+    def _result(self, allowed: bool, remaining: int, retry_after_seconds: int) -> Dict[str, Any]:
+        return {
+            'allowed': allowed,
+            'remaining': remaining,
+            'retry_after_seconds': retry_after_seconds
+        }
+    
+    async def _increment(self, db: AsyncIOMotorDatabase, user_uuid: str, window_start: int, window_end: int) -> int:
+        """Atomically increment the user's counter for the current window."""
+        key = f"{user_uuid}:{window_start}"
+        
+        # Counters on the shared cache skip the Mongo round-trip; while it is down they continue in Mongo
+        # (a window split across both may allow a few extra submissions, like the fail-open path)
+        count = await shared_cache.incr(f"rate:{key}", window_end + 300)
+        if count is not None:
+            return count
+        
+        update = {
+            "$inc": {"count": 1},
+            "$setOnInsert": {
+                "user_uuid": user_uuid,
+                "window_start": datetime.utcfromtimestamp(window_start),
+                # Keep the document a little past the window so late readers still see it
+                "expires_at": datetime.utcfromtimestamp(window_end) + timedelta(minutes=5)
+            }
+        }
+        
+        try:
+            document = await db[self.collection_name].find_one_and_update(
+                {"_id": key}, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Two first submissions raced on the upsert; the loser retries as a plain update
+            document = await db[self.collection_name].find_one_and_update(
+                {"_id": key}, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        return document['count']
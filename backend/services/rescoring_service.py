@@ -0,0 +1,154 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from services.scoring_engine import ScoringEngine
+from services.analysis_generator import AnalysisGenerator
+from services.deep_analysis_service import PRECOMPUTED_FIELD
+
+logger = logging.getLogger(__name__)
+
+class RescoringService:
+    def __init__(self, db, scoring_engine: Optional[ScoringEngine] = None, batch_size: int = 500,
+                 max_in_flight: int = 4, job_name: str = 'rescore-evaluations',
+                 analysis_generator: Optional[AnalysisGenerator] = None):
+        if batch_size < 1 or max_in_flight < 1:
+            raise ValueError("batch_size and max_in_flight must be at least 1")
+        
+        self.db = db
+        self.scoring_engine = scoring_engine or ScoringEngine()
+        self.analysis_generator = analysis_generator or AnalysisGenerator()
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.job_name = job_name
+        
+        self.projection = {
+            'form_data': 1,
+            'startup_type': 1,
+            'total_score': 1,
+            'section_scores': 1,
+            'verdict': 1,
+            'executive_summary': 1
+        }
+    
+    async def run(self, resume: bool = True, dry_run: bool = False) -> Dict[str, Any]:
+        """Stream every evaluation after the checkpoint, re-score it and bulk-write changes."""
+        stats = {'scanned': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'last_id': None}
+        
+        last_id = await self.load_checkpoint() if resume else None
+        query = {'_id': {'$gt': last_id}} if last_id is not None else {}
+        if last_id is not None:
+            logger.info(f"Resuming {self.job_name} after _id {last_id}")
+        
+        cursor = self.db.vc_evaluations.find(query, self.projection).sort('_id', 1).batch_size(self.batch_size)
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        pending = deque()
+        loop = asyncio.get_running_loop()
+        
+        try:
+            while True:
+                documents = await cursor.to_list(length=self.batch_size)
+                if not documents:
+                    break
+                
+                await in_flight.acquire()
+                task = asyncio.create_task(self._process_batch(documents, loop, stats, dry_run))
+                task.add_done_callback(lambda _: in_flight.release())
+                pending.append((documents[-1]['_id'], task))
+                
+                await self._advance_checkpoint(pending, stats, dry_run, wait=False)
+            
+            await self._advance_checkpoint(pending, stats, dry_run, wait=True)
+            
+            # A completed run needs no resume point; the next run starts from the beginning
+            if not dry_run:
+                await self.reset_checkpoint()
+        finally:
+            for _, task in pending:
+                task.cancel()
+        
+        logger.info(f"Rescoring finished: {stats}")
+        return stats
+    
+    async def _process_batch(self, documents: List[Dict[str, Any]], loop, stats: Dict[str, Any], dry_run: bool):
+        """Score one batch off the event loop and write back the documents that changed."""
+        form_data_batch = [document.get('form_data') or {} for document in documents]
+        startup_types = [document.get('startup_type', 'idea') for document in documents]
+        
+        results = await loop.run_in_executor(None, self._score_batch, form_data_batch, startup_types)
+        
+        operations = []
+        for document, result in zip(documents, results):
+            stats['scanned'] += 1
+            if result['verdict'].get('category') == 'error':
+                stats['failed'] += 1
+                continue
+            
+            update = {
+                'total_score': result['total_score'],
+                'section_scores': result['section_scores'],
+                'verdict': result['verdict'],
+                'executive_summary': result['executive_summary']
+            }
+            if all(document.get(key) == value for key, value in update.items()):
+                stats['unchanged'] += 1
+                continue
+            
+            # A premium analysis precomputed from the old scores would contradict the new verdict
+            operations.append(UpdateOne({'_id': document['_id']}, {'$set': update, '$unset': {PRECOMPUTED_FIELD: ''}}))
+        
+        if operations and not dry_run:
+            await self.db.vc_evaluations.bulk_write(operations, ordered=False)
+        stats['updated'] += len(operations)
+    
+    def _score_batch(self, form_data_batch: List[Dict[str, Any]], startup_types: List[str]) -> List[Dict[str, Any]]:
+        """Score a batch and write each executive summary from its new verdict, as /evaluate does."""
+        results = self.scoring_engine.calculate_scores_batch(form_data_batch, startup_types)
+        for form_data, result in zip(form_data_batch, results):
+            if result['verdict'].get('category') != 'error':
+                result['executive_summary'] = self.analysis_generator.generate_executive_summary(
+                    result['total_score'], result['verdict'], form_data
+                )
+        return results
+    
+    async def _advance_checkpoint(self, pending: deque, stats: Dict[str, Any], dry_run: bool, wait: bool):
+        """Checkpoint the last _id of the longest prefix of completed batches."""
+        checkpoint_id = None
+        while pending and (wait or pending[0][1].done()):
+            batch_last_id, task = pending[0]
+            await task  # Re-raises write failures so the checkpoint never skips a batch
+            pending.popleft()
+            checkpoint_id = batch_last_id
+        
+        if checkpoint_id is not None:
+            stats['last_id'] = checkpoint_id
+            if not dry_run:
+                await self.save_checkpoint(checkpoint_id, stats)
+    
+    async def load_checkpoint(self) -> Optional[Any]:
+        """Return the last fully processed _id of an interrupted run, if any."""
+        checkpoint = await self.db.rescoring_checkpoints.find_one({'_id': self.job_name})
+        return checkpoint.get('last_id') if checkpoint else None
+    
+    async def save_checkpoint(self, last_id: Any, stats: Dict[str, Any]):
+        """Persist the last fully processed _id for this job."""
+        await self.db.rescoring_checkpoints.update_one(
+            {'_id': self.job_name},
+            {
+                '$set': {
+                    'last_id': last_id,
+                    'scanned': stats['scanned'],
+                    'updated': stats['updated'],
+                    'updated_at': datetime.utcnow()
+                }
+            },
+            upsert=True
+        )
+    
+    async def reset_checkpoint(self):
+        """Forget the checkpoint so the next run starts from the beginning."""
+        await self.db.rescoring_checkpoints.delete_one({'_id': self.job_name})
@@ -0,0 +1,27 @@
+from typing import Dict, Any, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+
+# The options FastAPI's ORJSONResponse renders with, so pre-rendered and regular bodies match
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def render_json(content: Any) -> bytes:
+    """Serialize ``content`` to JSON bytes with orjson."""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+def render_members(content: Dict[str, Any]) -> bytes:
+    """Serialize a dict without its braces, for splicing into a larger pre-rendered object."""
+    return render_json(content)[1:-1]
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Serialize trusted route output directly, skipping response_model validation and jsonable_encoder.
+    
+    Only for dicts the service built itself from JSON-native values (str, numbers, bools, None,
+    lists, dicts and datetimes); anything else should go through the normal response_model path.
+    """
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+def prerendered_response(body: bytes, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Send an already serialized JSON body as-is."""
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
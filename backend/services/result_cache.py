@@ -0,0 +1,123 @@
+from typing import Dict, Any, List, Optional
+import os
+import copy
+import logging
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+
+from services.cache import TTLCache, content_hash
+from services.metrics import metrics
+from services.scoring_engine import ScoringEngine, SCORING_VERSION
+from services.analysis_generator import AnalysisGenerator, TEMPLATE_VERSION
+
+logger = logging.getLogger(__name__)
+
+class EvaluationResultCache:
+    # Content-addressed cache for the deterministic part of an evaluation (score + executive summary).
+    # Keys include SCORING_VERSION, TEMPLATE_VERSION and the rules version so rule changes never serve stale results
+    def __init__(self, scoring_engine: ScoringEngine, analysis_generator: AnalysisGenerator,
+                 maxsize: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 use_mongo: Optional[bool] = None, collection_name: str = 'evaluation_result_cache'):
+        self.scoring_engine = scoring_engine
+        self.analysis_generator = analysis_generator
+        self.ttl_seconds = ttl_seconds or float(os.getenv('RESULT_CACHE_TTL_SECONDS', '86400'))
+        self.memory = TTLCache(
+            maxsize=maxsize or int(os.getenv('RESULT_CACHE_SIZE', '2048')),
+            ttl_seconds=self.ttl_seconds
+        )
+        if use_mongo is None:
+            use_mongo = os.getenv('RESULT_CACHE_MONGO', 'false').lower() == 'true'
+        self.use_mongo = use_mongo
+        self.collection_name = collection_name
+        self.counters = {
+            'mongo_hits': 0,
+            'mongo_misses': 0,
+            'mongo_errors': 0,
+            'computed': 0
+        }
+    
+    def index_plan(self) -> Dict[str, List[IndexModel]]:
+        """TTL index that expires Mongo-tier entries (none when the Mongo tier is off)."""
+        if not self.use_mongo:
+            return {}
+        return {
+            self.collection_name: [
+                IndexModel([("created_at", ASCENDING)], name='created_at_ttl', expireAfterSeconds=int(self.ttl_seconds))
+            ]
+        }
+    
+    async def get_or_compute(self, form_data: Dict[str, Any], startup_type: str,
+                             db: Optional[AsyncIOMotorDatabase] = None) -> Dict[str, Any]:
+        """Return score, section scores, verdict and executive summary for a sanitized submission.
+        
+        Looks in the in-process tier, then the Mongo tier, and only computes on a miss in both.
+        """
+        key = content_hash(SCORING_VERSION, TEMPLATE_VERSION, self.scoring_engine.rules.version, form_data, startup_type)
+        
+        result = self.memory.get(key)
+        if result is None and self.use_mongo and db is not None:
+            result = await self._load(db, key)
+            if result is not None:
+                self.memory.set(key, result)
+        
+        if result is None:
+            result = self._compute(form_data, startup_type)
+            self.memory.set(key, result)
+            if self.use_mongo and db is not None:
+                await self._store(db, key, result)
+        
+        # Callers own the returned structure; the cached copy is never handed out
+        return copy.deepcopy(result)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for both tiers."""
+        return {
+            'memory': self.memory.stats(),
+            'mongo_enabled': self.use_mongo,
+            **self.counters
+        }
+    
+    def _compute(self, form_data: Dict[str, Any], startup_type: str) -> Dict[str, Any]:
+        with metrics.span('scoring.calculate_score'):
+            scoring_result = self.scoring_engine.calculate_score(form_data, startup_type)
+        with metrics.span('analysis.executive_summary'):
+            executive_summary = self.analysis_generator.generate_executive_summary(
+                scoring_result['total_score'],
+                scoring_result['verdict'],
+                form_data
+            )
+        self.counters['computed'] += 1
+        return {
+            'total_score': scoring_result['total_score'],
+            'section_scores': scoring_result['section_scores'],
+            'verdict': scoring_result['verdict'],
+            'executive_summary': executive_summary
+        }
+    
+    async def _load(self, db: AsyncIOMotorDatabase, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            document = await db[self.collection_name].find_one({"_id": key}, {"result": 1})
+        except Exception as e:
+            # The Mongo tier is an optimization; fall through to computing
+            self.counters['mongo_errors'] += 1
+            logger.error(f"Result cache read error: {str(e)}")
+            return None
+        
+        if document is None:
+            self.counters['mongo_misses'] += 1
+            return None
+        self.counters['mongo_hits'] += 1
+        return document['result']
+    
+    async def _store(self, db: AsyncIOMotorDatabase, key: str, result: Dict[str, Any]):
+        try:
+            await db[self.collection_name].replace_one(
+                {"_id": key},
+                {"_id": key, "result": result, "created_at": datetime.utcnow()},
+                upsert=True
+            )
+        except Exception as e:
+            self.counters['mongo_errors'] += 1
+            logger.error(f"Result cache write error: {str(e)}")
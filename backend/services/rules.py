@@ -0,0 +1,307 @@
+from typing import Dict, Any, List, Optional, Callable
+import os
+import json
+import asyncio
+import logging
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+from services.cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).parent.parent / 'config' / 'rules.json'
+
+class RulesError(ValueError):
+    # Raised when a rules file is unreadable or fails validation
+    pass
+
+class Rules:
+    # One immutable, versioned snapshot of the scoring, validation and analysis rules
+    def __init__(self, raw: Dict[str, Any], source: str = '<memory>'):
+        errors = validate_rules(raw)
+        if errors:
+            raise RulesError(f"Invalid rules in {source}: " + "; ".join(errors))
+        
+        self.version = raw['version']
+        self.fingerprint = content_hash(raw)
+        self.source = source
+        self.loaded_at = time.time()
+        
+        scoring = raw['scoring']
+        validation = raw['validation']
+        # Nested dicts become read-only mappings and lists become tuples; thresholds keep
+        # the tuple shapes the services have always used
+        self.scoring = _freeze({
+            **scoring,
+            'numeric_thresholds': {
+                field_id: (rule['cuts'], rule['scores'], rule['higher_is_better'])
+                for field_id, rule in scoring['numeric_thresholds'].items()
+            },
+            'word_count_thresholds': (scoring['word_count_thresholds']['cuts'], scoring['word_count_thresholds']['scores']),
+            'verdicts': [
+                (verdict['below'], {key: value for key, value in verdict.items() if key != 'below'})
+                for verdict in scoring['verdicts']
+            ]
+        })
+        self.validation = _freeze({
+            **validation,
+            'numeric_ranges': {field_id: (bounds['min'], bounds['max']) for field_id, bounds in validation['numeric_ranges'].items()},
+            'text_length_ranges': {field_id: (bounds['min'], bounds['max']) for field_id, bounds in validation['text_length_ranges'].items()}
+        })
+        self.analysis = _freeze(raw['analysis'])
+        
+        # Lookup structures services build from this snapshot, shared by every instance
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.Lock()
+    
+    def derive(self, name: str, build: Callable[['Rules'], Any]) -> Any:
+        """Return ``build(self)``, computed once per snapshot and shared by all callers."""
+        derived = self._derived.get(name)
+        if derived is None:
+            with self._derived_lock:
+                derived = self._derived.get(name)
+                if derived is None:
+                    derived = self._derived[name] = build(self)
+        return derived
+    
+    def describe(self) -> Dict[str, Any]:
+        """Version details for health and metrics; only the file name of the source, never its path."""
+        return {
+            'version': self.version,
+            'fingerprint': self.fingerprint,
+            'source': Path(self.source).name,
+            'loaded_at': self.loaded_at
+        }
+
+class RulesProvider:
+    # Holds the current Rules snapshot; a reload swaps the reference, so in-flight requests keep theirs
+    def __init__(self, path: Optional[str] = None, watch_interval_seconds: Optional[float] = None):
+        self.path = Path(path or os.getenv('RULES_PATH', str(DEFAULT_RULES_PATH)))
+        self.watch_interval_seconds = (
+            watch_interval_seconds if watch_interval_seconds is not None
+            else float(os.getenv('RULES_WATCH_INTERVAL_SECONDS', '0'))
+        )
+        self._mtime = self._stat_mtime()
+        # Loaded and validated at import, so a broken rules file stops the process from starting
+        self.current = self._load()
+        self.subscribers: List[Callable[[Rules], None]] = []
+        self._watcher: Optional[asyncio.Task] = None
+        self.counters = {
+            'reloads': 0,
+            'reload_failures': 0
+        }
+        logger.info(f"Rules version {self.current.version} loaded from {self.path}")
+    
+    def subscribe(self, callback: Callable[[Rules], None]):
+        """Call ``callback(rules)`` after every successful reload."""
+        self.subscribers.append(callback)
+    
+    async def reload(self) -> Rules:
+        """Load and validate the rules file off the event loop, then swap it in.
+        
+        Raises RulesError (keeping the current rules) when the file is invalid, or when its
+        content changed without a version bump, since caches key on the version.
+        """
+        try:
+            mtime = self._stat_mtime()
+            rules = await asyncio.to_thread(self._load)
+            if rules.fingerprint != self.current.fingerprint and rules.version == self.current.version:
+                raise RulesError(f"Rules in {self.path} changed without a version bump (still {rules.version})")
+        except Exception:
+            self.counters['reload_failures'] += 1
+            raise
+        
+        self._mtime = mtime
+        if rules.fingerprint == self.current.fingerprint:
+            return self.current
+        
+        # A single reference assignment on the event loop thread: each request sees old or new, never a mix
+        previous, self.current = self.current, rules
+        self.counters['reloads'] += 1
+        for callback in self.subscribers:
+            try:
+                callback(rules)
+            except Exception as e:
+                logger.error(f"Rules reload subscriber failed: {str(e)}")
+        logger.info(f"Rules reloaded: version {previous.version} -> {rules.version}")
+        return rules
+    
+    def start_watching(self):
+        """Reload whenever the file's mtime changes (RULES_WATCH_INTERVAL_SECONDS > 0), e.g. in every worker."""
+        if self.watch_interval_seconds > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+    
+    async def stop_watching(self):
+        if self._watcher is None:
+            return
+        self._watcher.cancel()
+        try:
+            await self._watcher
+        except asyncio.CancelledError:
+            pass
+        self._watcher = None
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            **self.current.describe(),
+            'watch_interval_seconds': self.watch_interval_seconds,
+            **self.counters
+        }
+    
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.watch_interval_seconds)
+            mtime = self._stat_mtime()
+            if mtime == self._mtime:
+                continue
+            # A broken file is reported once, not on every poll, until it changes again
+            self._mtime = mtime
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Rules reload failed; keeping version {self.current.version}: {str(e)}")
+    
+    def _load(self) -> Rules:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            raise RulesError(f"Cannot read rules from {self.path}: {str(e)}")
+        return Rules(raw, source=str(self.path))
+    
+    def _stat_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+def validate_rules(raw: Any) -> List[str]:
+    """Return every problem found in a raw rules document (empty when valid)."""
+    if not isinstance(raw, dict):
+        return ["rules must be a JSON object"]
+    errors = []
+    
+    version = raw.get('version')
+    if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+        errors.append("version must be a positive integer")
+    for section in ('scoring', 'validation', 'analysis'):
+        if not isinstance(raw.get(section), dict):
+            errors.append(f"{section} must be an object")
+    if errors:
+        return errors
+    
+    errors.extend(_validate_scoring(raw['scoring']))
+    errors.extend(_validate_validation(raw['validation']))
+    errors.extend(_validate_analysis(raw['analysis'], raw['scoring']))
+    return errors
+
+def _validate_scoring(scoring: Dict[str, Any]) -> List[str]:
+    errors = []
+    matrix = scoring.get('scoring_matrix')
+    weights = scoring.get('section_weights')
+    section_fields = scoring.get('section_fields')
+    stage_sections = scoring.get('stage_sections')
+    if not isinstance(matrix, dict) or not all(
+        isinstance(options, dict) and options and all(_is_number(score) for score in options.values())
+        for options in matrix.values()
+    ):
+        errors.append("scoring.scoring_matrix must map fields to non-empty {option: score} objects")
+    if not isinstance(weights, dict) or not all(_is_number(weight) and weight >= 0 for weight in weights.values()):
+        errors.append("scoring.section_weights must map sections to non-negative numbers")
+    if not isinstance(section_fields, dict) or not all(isinstance(fields, list) for fields in section_fields.values()):
+        errors.append("scoring.section_fields must map sections to field lists")
+    if not isinstance(stage_sections, dict) or 'idea' not in stage_sections:
+        errors.append("scoring.stage_sections must define at least the 'idea' stage")
+    if errors:
+        return errors
+    
+    for stage, sections in stage_sections.items():
+        for section in sections:
+            if section not in section_fields or section not in weights:
+                errors.append(f"scoring.stage_sections.{stage}: section '{section}' needs fields and a weight")
+    
+    for field_id, rule in (scoring.get('numeric_thresholds') or {}).items():
+        if not isinstance(rule, dict) or not isinstance(rule.get('higher_is_better'), bool):
+            errors.append(f"scoring.numeric_thresholds.{field_id} needs cuts, scores and higher_is_better")
+            continue
+        errors.extend(_validate_cuts(f"scoring.numeric_thresholds.{field_id}", rule.get('cuts'), rule.get('scores')))
+    
+    word_counts = scoring.get('word_count_thresholds')
+    if not isinstance(word_counts, dict):
+        errors.append("scoring.word_count_thresholds needs cuts and scores")
+    else:
+        errors.extend(_validate_cuts("scoring.word_count_thresholds", word_counts.get('cuts'), word_counts.get('scores')))
+    
+    selection_scores = scoring.get('selection_scores')
+    if not isinstance(selection_scores, list) or not selection_scores or not all(map(_is_number, selection_scores)):
+        errors.append("scoring.selection_scores must be a non-empty list of numbers")
+    
+    verdicts = scoring.get('verdicts')
+    if not isinstance(verdicts, list) or not verdicts:
+        errors.append("scoring.verdicts must be a non-empty list")
+    else:
+        cuts = [verdict.get('below') if isinstance(verdict, dict) else None for verdict in verdicts]
+        if cuts[-1] is not None or not all(map(_is_number, cuts[:-1])) or cuts[:-1] != sorted(cuts[:-1]):
+            errors.append("scoring.verdicts must have ascending 'below' cut-offs and end with below: null")
+        for verdict in verdicts:
+            if not isinstance(verdict, dict) or not all(isinstance(verdict.get(key), str) for key in ('emoji', 'text', 'category')):
+                errors.append("every scoring.verdicts entry needs emoji, text and category")
+                break
+    return errors
+
+def _validate_validation(validation: Dict[str, Any]) -> List[str]:
+    errors = []
+    required = validation.get('required_fields')
+    if not isinstance(required, dict) or not all(isinstance(fields, list) for fields in required.values()):
+        errors.append("validation.required_fields must map stages to field lists")
+    for name in ('numeric_ranges', 'text_length_ranges'):
+        ranges = validation.get(name)
+        if not isinstance(ranges, dict):
+            errors.append(f"validation.{name} must be an object")
+            continue
+        for field_id, bounds in ranges.items():
+            if (not isinstance(bounds, dict) or not _is_number(bounds.get('min')) or not _is_number(bounds.get('max'))
+                    or bounds['min'] > bounds['max']):
+                errors.append(f"validation.{name}.{field_id} needs numeric min <= max")
+    completion = validation.get('min_completion_time_ms')
+    if not _is_number(completion) or completion < 0:
+        errors.append("validation.min_completion_time_ms must be a non-negative number")
+    limit = validation.get('max_submissions_per_day')
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        errors.append("validation.max_submissions_per_day must be a positive integer")
+    return errors
+
+def _validate_analysis(analysis: Dict[str, Any], scoring: Dict[str, Any]) -> List[str]:
+    summaries = analysis.get('executive_summaries')
+    if not isinstance(summaries, dict) or not all(isinstance(text, str) for text in summaries.values()):
+        return ["analysis.executive_summaries must map verdict categories to text"]
+    categories = {verdict.get('category') for verdict in scoring.get('verdicts') or [] if isinstance(verdict, dict)}
+    missing = sorted(category for category in categories | {'not-ready'} if category not in summaries)
+    if missing:
+        return [f"analysis.executive_summaries is missing {', '.join(map(str, missing))}"]
+    return []
+
+def _validate_cuts(name: str, cuts: Any, scores: Any) -> List[str]:
+    if (not isinstance(cuts, list) or not isinstance(scores, list)
+            or not all(map(_is_number, cuts)) or not all(map(_is_number, scores))):
+        return [f"{name} cuts and scores must be lists of numbers"]
+    if cuts != sorted(cuts):
+        return [f"{name} cuts must be ascending"]
+    if len(scores) != len(cuts) + 1:
+        return [f"{name} needs exactly one more score than cuts"]
+    return []
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+rules_provider = RulesProvider()
@@ -1,212 +1,152 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Union
+from bisect import bisect_left, bisect_right
 import logging
 
+from services.rules import Rules, rules_provider
+
 logger = logging.getLogger(__name__)
 
-class ScoringEngine:
-    def __init__(self):
-        self.scoring_matrix = {
-            # Founding Team Scoring (30% weight)
-            'team-size': {
-                '1': 5,
-                '2-3': 10,
-                '4-5': 8,
-                '6+': 6
-            },
-            'founder-experience': {
-                'first-time': 4,
-                'some-experience': 7,
-                'serial-entrepreneurs': 9,
-                'industry-veterans': 10
-            },
-            'technical-expertise': {
-                'no-tech': 3,
-                'outsourced': 5,
-                'tech-cofounder': 9,
-                'tech-team': 10
-            },
-            'domain-expertise': {
-                'limited': 3,
-                'some-knowledge': 6,
-                'deep-expertise': 9,
-                'industry-insider': 10
-            },
-            'commitment-level': {
-                'part-time': 3,
-                'mostly-full': 6,
-                'full-time': 9,
-                'bootstrapped': 10
-            },
-            
-            # Market Opportunity Scoring (25% weight)
-            'market-size-tam': {
-                'under-100m': 3,
-                '100m-1b': 6,
-                '1b-10b': 9,
-                'over-10b': 10
-            },
-            'market-size-som': {
-                'under-10m': 4,
-                '10m-100m': 7,
-                '100m-500m': 9,
-                'over-500m': 10
-            },
-            'market-growth': {
-                'declining': 2,
-                'stable': 5,
-                'growing': 8,
-                'exploding': 10
-            },
-            'market-timing': {
-                'too-early': 4,
-                'emerging': 8,
-                'perfect-timing': 10,
-                'mature': 6
-            },
-            
-            # Problem/Solution Fit Scoring (20% weight)
-            'problem-severity': {
-                'nice-to-have': 3,
-                'moderate-pain': 6,
-                'significant-pain': 8,
-                'critical-pain': 10
-            },
-            'problem-frequency': {
-                'rare': 3,
-                'occasional': 5,
-                'frequent': 8,
-                'daily': 10
-            },
-            'current-solution': {
-                'no-solution': 8,
-                'poor-alternatives': 9,
-                'decent-competitors': 6,
-                'strong-incumbents': 4
-            },
-            'solution-uniqueness': {
-                'incremental': 4,
-                'significant-better': 7,
-                'breakthrough': 9,
-                'paradigm-shift': 10
-            },
-            
-            # Competitive Advantage Scoring (10% weight)
-            'ip-protection': {
-                'none': 3,
-                'trade-secrets': 6,
-                'pending-patents': 8,
-                'granted-ip': 10
-            },
-            'competitive-timeline': {
-                'immediate': 3,
-                'months': 5,
-                'year-plus': 8,
-                'very-difficult': 10
-            },
-            
-            # Business Model Scoring (15% weight)
-            'revenue-model': {
-                'subscription': 9,
-                'transaction': 8,
-                'marketplace': 8,
-                'advertising': 6,
-                'enterprise': 9,
-                'product-sales': 7,
-                'freemium': 6,
-                'other': 5
-            },
-            'unit-economics-visibility': {
-                'unclear': 3,
-                'rough-estimates': 5,
-                'solid-projections': 8,
-                'proven-metrics': 10
-            },
-            'scalability': {
-                'linear': 4,
-                'moderate': 6,
-                'high-leverage': 9,
-                'viral-network': 10
-            },
-            
-            # Validation & Traction Scoring (25% weight for idea, adjusted for launched)
-            'customer-count': {
-                'none': 2,
-                '1-10': 4,
-                '11-50': 6,
-                '51-100': 7,
-                '101-500': 9,
-                '500+': 10
-            },
-            
-            # Launched-specific scoring
-            'mrr': {
-                'under-1k': 3,
-                '1k-10k': 5,
-                '10k-50k': 7,
-                '50k-100k': 8,
-                '100k-500k': 9,
-                'over-500k': 10
-            },
-            'funding-amount': {
-                'under-500k': 6,
-                '500k-1m': 7,
-                '1m-2m': 8,
-                '2m-5m': 9,
-                'over-5m': 10
-            }
-        }
+# Bump whenever the scoring code changes; rule changes are versioned in config/rules.json
+SCORING_VERSION = 1
+
+# Cell kinds used when encoding form data for batch scoring
+_KIND_ABSENT = 0
+_KIND_SCORE = 1
+_KIND_WORDS = 2
+_KIND_SELECTIONS = 3
+_KIND_NUMERIC = 4
+
+class _CompiledRules:
+    # Lookup tables compiled from one Rules snapshot
+    __slots__ = ('numeric_rules', 'word_cuts', 'word_scores', 'selection_scores', 'max_selections',
+                 'verdict_cuts', 'verdict_table', 'plans', 'default_plan', 'scoring_matrix')
+    
+    def __init__(self, rules: Rules):
+        """Compile the scoring rules into flat per-stage lookup plans.
+        
+        Each plan holds the stage's section names and weights, its total weight and a
+        flat tuple of ``(field, section_index, value_table, is_text, numeric_rule)``
+        entries so that scoring a submission is a single pass over its fields.
+        """
+        scoring = rules.scoring
+        # Plain dict copies: the frozen rules mappings are slower to probe in the hot loop
+        self.scoring_matrix = {field_id: dict(options) for field_id, options in scoring['scoring_matrix'].items()}
+        
+        self.numeric_rules = {}
+        for field_id, (cuts, scores, higher_is_better) in scoring['numeric_thresholds'].items():
+            search = bisect_right if higher_is_better else bisect_left
+            fallback = scores[0] if higher_is_better else scores[-1]
+            self.numeric_rules[field_id] = (search, tuple(cuts), tuple(scores), fallback)
         
-        self.section_weights = {
-            'founding-team': 30,
-            'market-opportunity': 25,
-            'problem-solution-fit': 20,
-            'competitive-advantage': 10,
-            'business-model': 15,
-            'validation-traction': 25,  # For idea stage
-            'unit-economics': 20,       # For launched stage
-            'financials-capital': 15    # For launched stage
-        }
+        self.word_cuts = tuple(scoring['word_count_thresholds'][0])
+        self.word_scores = tuple(scoring['word_count_thresholds'][1])
+        self.selection_scores = tuple(scoring['selection_scores'])
+        self.max_selections = len(self.selection_scores) - 1
+        self.verdict_cuts = tuple(cut for cut, _ in scoring['verdicts'][:-1])
+        self.verdict_table = tuple(dict(verdict) for _, verdict in scoring['verdicts'])
+        
+        self.plans = {}
+        for stage, sections in scoring['stage_sections'].items():
+            fields = []
+            for index, section in enumerate(sections):
+                for field_id in scoring['section_fields'][section]:
+                    fields.append(self.compile_field(field_id, index))
+            weights = tuple(scoring['section_weights'][section] for section in sections)
+            self.plans[stage] = (tuple(sections), weights, sum(weights), tuple(fields))
+        # Any non-launched startup type is scored on the idea-stage sections
+        self.default_plan = self.plans['idea']
+    
+    def compile_field(self, field_id: str, section_index: int) -> Tuple:
+        """Compile the lookup entry for a single field."""
+        is_text = field_id.endswith('-textarea') or 'description' in field_id or 'proposition' in field_id
+        return (field_id, section_index, self.scoring_matrix.get(field_id), is_text,
+                self.numeric_rules.get(field_id))
+
+class ScoringEngine:
+    def __init__(self, rules: Optional[Rules] = None):
+        # Scoring tables come from the shared, hot-reloadable rules unless pinned for this instance
+        self._pinned_rules = rules
+    
+    @property
+    def rules(self) -> Rules:
+        return self._pinned_rules or rules_provider.current
+    
+    @property
+    def scoring_matrix(self) -> Mapping[str, Mapping[str, int]]:
+        return self.rules.scoring['scoring_matrix']
+    
+    @property
+    def section_weights(self) -> Mapping[str, int]:
+        return self.rules.scoring['section_weights']
+    
+    @property
+    def section_fields(self) -> Mapping[str, Tuple[str, ...]]:
+        return self.rules.scoring['section_fields']
+    
+    @property
+    def stage_sections(self) -> Mapping[str, Tuple[str, ...]]:
+        return self.rules.scoring['stage_sections']
+    
+    @property
+    def numeric_thresholds(self) -> Mapping[str, Tuple]:
+        return self.rules.scoring['numeric_thresholds']
+    
+    @property
+    def word_count_thresholds(self) -> Tuple:
+        return self.rules.scoring['word_count_thresholds']
+    
+    @property
+    def selection_scores(self) -> Tuple[int, ...]:
+        return self.rules.scoring['selection_scores']
+    
+    @property
+    def verdicts(self) -> Tuple:
+        return self.rules.scoring['verdicts']
+    
+    def _compiled(self) -> _CompiledRules:
+        # Compiled once per rules snapshot and shared by every ScoringEngine
+        return self.rules.derive('scoring', _CompiledRules)
     
     def calculate_score(self, form_data: Dict[str, Any], startup_type: str) -> Dict[str, Any]:
         """Calculate comprehensive startup score based on form data."""
         try:
-            section_scores = {}
-            total_weighted_score = 0
-            total_weight = 0
-            
-            # Calculate section scores
-            section_scores['founding-team'] = self._calculate_team_score(form_data)
-            section_scores['market-opportunity'] = self._calculate_market_score(form_data)
-            section_scores['problem-solution-fit'] = self._calculate_problem_solution_score(form_data)
-            section_scores['competitive-advantage'] = self._calculate_competitive_score(form_data)
-            section_scores['business-model'] = self._calculate_business_model_score(form_data)
-            section_scores['validation-traction'] = self._calculate_traction_score(form_data, startup_type)
+            compiled = self._compiled()
+            sections, weights, total_weight, fields = compiled.plans.get(startup_type, compiled.default_plan)
+            sums = [0] * len(sections)
+            counts = [0] * len(sections)
             
-            # Add launched-specific sections
-            if startup_type == 'launched':
-                section_scores['unit-economics'] = self._calculate_unit_economics_score(form_data)
-                section_scores['financials-capital'] = self._calculate_financials_score(form_data)
+            # Single pass over the compiled field plan
+            for field_id, index, table, is_text, numeric_rule in fields:
+                value = form_data.get(field_id)
+                if value is None:
+                    continue
+                score = table.get(value) if table is not None else None
+                if score is None:
+                    score = self._get_dynamic_score(compiled, value, is_text, numeric_rule)
+                sums[index] += score
+                counts[index] += 1
             
-            # Calculate weighted total
-            for section, score in section_scores.items():
-                if section in self.section_weights and score is not None:
-                    weight = self.section_weights[section]
-                    total_weighted_score += score * weight
-                    total_weight += weight
+            # Calculate section averages and weighted total
+            section_scores = {}
+            total_weighted_score = 0
+            for index, section in enumerate(sections):
+                score = sums[index] / counts[index] if counts[index] else 0
+                section_scores[section] = round(score, 1)
+                total_weighted_score += score * weights[index]
             
             # Normalize to 0-100 scale
             final_score = (total_weighted_score / total_weight) if total_weight > 0 else 0
             final_score = min(100, max(0, final_score))
             
             # Generate verdict
-            verdict = self._generate_verdict(final_score)
+            verdict = self._generate_verdict(compiled, final_score)
             
             return {
                 'total_score': round(final_score, 1),
-                'section_scores': {k: round(v, 1) if v is not None else 0 for k, v in section_scores.items()},
+                'section_scores': section_scores,
                 'verdict': verdict
             }
-            
+        
         except Exception as e:
             logger.error(f"Error calculating score: {str(e)}")
             return {
@@ -215,130 +155,232 @@ class ScoringEngine:
                 'verdict': {'emoji': '⚠️', 'text': 'Error in calculation', 'category': 'error'}
             }
     
-    def _get_field_score(self, field_id: str, value: Any) -> float:
-        """Get score for a specific field value."""
-        if field_id in self.scoring_matrix and value in self.scoring_matrix[field_id]:
-            return self.scoring_matrix[field_id][value]
-        return self._get_dynamic_score(field_id, value)
-    
-    def _get_dynamic_score(self, field_id: str, value: Any) -> float:
-        """Calculate dynamic score for fields not in scoring matrix."""
-        if isinstance(value, str):
-            if field_id.endswith('-textarea') or 'description' in field_id or 'proposition' in field_id:
-                word_count = len(value.split())
-                if word_count >= 50: return 9
-                elif word_count >= 25: return 7
-                elif word_count >= 10: return 5
-                else: return 3
+    def calculate_scores_batch(self, form_data_batch: List[Dict[str, Any]],
+                               startup_types: Union[str, List[str]]) -> List[Dict[str, Any]]:
+        """Calculate scores for a batch of submissions using NumPy.
         
-        if isinstance(value, list):  # For checkbox fields
-            selections = len(value)
-            if selections >= 3: return 9
-            elif selections >= 2: return 7
-            elif selections >= 1: return 5
-            else: return 2
+        ``startup_types`` is either a single startup type for the whole batch or one
+        entry per submission. Results are identical to calling ``calculate_score`` on
+        each submission, including the error result for submissions that cannot be scored.
+        """
+        if isinstance(startup_types, str):
+            startup_types = [startup_types] * len(form_data_batch)
+        if len(startup_types) != len(form_data_batch):
+            raise ValueError("startup_types must match the number of submissions")
         
-        if isinstance(value, (int, float)):
-            return self._score_numeric_field(field_id, value)
+        results = [None] * len(form_data_batch)
+        compiled = self._compiled()
         
-        return 5  # Default score
+        # Group rows by compiled plan so each group shares one field/section layout
+        groups = {}
+        for row, startup_type in enumerate(startup_types):
+            stage = startup_type if startup_type in compiled.plans else 'idea'
+            groups.setdefault(stage, []).append(row)
+        
+        for stage, rows in groups.items():
+            plan = compiled.plans[stage]
+            for row, result in zip(rows, self._score_batch_group(compiled, plan, [form_data_batch[i] for i in rows])):
+                results[row] = result
+        
+        return results
     
-    def _score_numeric_field(self, field_id: str, value: float) -> float:
-        """Score numeric fields based on business logic."""
-        if field_id == 'cac':
-            if value <= 50: return 10
-            elif value <= 100: return 8
-            elif value <= 200: return 6
-            else: return 4
+    def _score_batch_group(self, compiled: _CompiledRules, plan: Tuple, form_data_batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score submissions that share a single compiled plan."""
+        # numpy is only needed for batch scoring (rescore jobs), so the API process doesn't import it at startup
+        import numpy as np
         
-        elif field_id == 'ltv':
-            if value >= 500: return 10
-            elif value >= 300: return 8
-            elif value >= 150: return 6
-            else: return 4
+        sections, weights, total_weight, fields = plan
+        n_rows, n_fields = len(form_data_batch), len(fields)
         
-        elif field_id == 'growth-rate':
-            if value >= 15: return 10
-            elif value >= 10: return 8
-            elif value >= 5: return 6
-            else: return 4
+        # Encode the batch column by column: each cell holds either a direct score or a
+        # raw numeric, word-count or selection-count value, tagged by kind for vectorized lookup.
+        kind_columns = []
+        value_columns = []
+        failed = [not isinstance(form_data, dict) for form_data in form_data_batch]
+        if any(failed):
+            form_data_batch = [{} if bad else form_data for bad, form_data in zip(failed, form_data_batch)]
         
-        elif field_id == 'gross-margin':
-            if value >= 80: return 10
-            elif value >= 60: return 8
-            elif value >= 40: return 6
-            else: return 4
+        for field_id, _, table, is_text, numeric_rule in fields:
+            values = [form_data.get(field_id) for form_data in form_data_batch]
+            if table is not None:
+                direct = self._lookup_column(table, values, failed)
+                if None not in direct:
+                    # Every row scored straight from the matrix
+                    kind_columns.append([_KIND_SCORE] * n_rows)
+                    value_columns.append(direct)
+                    continue
+                col_kinds = [_KIND_ABSENT if score is None else _KIND_SCORE for score in direct]
+                col_values = [0.0 if score is None else score for score in direct]
+                misses = [row for row, (value, score) in enumerate(zip(values, direct))
+                          if score is None and value is not None]
+            else:
+                col_kinds = [_KIND_ABSENT] * n_rows
+                col_values = [0.0] * n_rows
+                misses = [row for row, value in enumerate(values) if value is not None]
+            
+            if len(misses) == n_rows:
+                col_kinds, col_values = self._encode_column(values, is_text, numeric_rule)
+            elif misses:
+                miss_kinds, miss_values = self._encode_column([values[row] for row in misses], is_text, numeric_rule)
+                for row, kind, cell in zip(misses, miss_kinds, miss_values):
+                    col_kinds[row] = kind
+                    col_values[row] = cell
+            kind_columns.append(col_kinds)
+            value_columns.append(col_values)
         
-        elif field_id == 'churn-rate':
-            if value <= 2: return 10
-            elif value <= 5: return 8
-            elif value <= 10: return 6
-            else: return 4
+        kinds = np.array(kind_columns, dtype=np.int8).reshape(n_fields, n_rows).T
+        encoded = np.array(value_columns, dtype=np.float64).reshape(n_fields, n_rows).T
+        scores = np.where(kinds == _KIND_SCORE, encoded, 0.0)
         
-        return 5
-    
-    def _calculate_team_score(self, form_data: Dict[str, Any]) -> float:
-        """Calculate founding team score."""
-        team_fields = ['team-size', 'founder-experience', 'technical-expertise', 
-                      'domain-expertise', 'commitment-level']
-        return self._calculate_section_average(form_data, team_fields)
-    
-    def _calculate_market_score(self, form_data: Dict[str, Any]) -> float:
-        """Calculate market opportunity score."""
-        market_fields = ['market-size-tam', 'market-size-som', 'market-growth', 
-                        'market-timing', 'customer-segment']
-        return self._calculate_section_average(form_data, market_fields)
-    
-    def _calculate_problem_solution_score(self, form_data: Dict[str, Any]) -> float:
-        """Calculate problem/solution fit score."""
-        problem_fields = ['problem-severity', 'problem-frequency', 'current-solution', 
-                         'solution-uniqueness', 'value-proposition']
-        return self._calculate_section_average(form_data, problem_fields)
-    
-    def _calculate_competitive_score(self, form_data: Dict[str, Any]) -> float:
-        """Calculate competitive advantage score."""
-        competitive_fields = ['defensibility', 'ip-protection', 'competitive-timeline']
-        return self._calculate_section_average(form_data, competitive_fields)
+        words = kinds == _KIND_WORDS
+        if words.any():
+            lookup = np.searchsorted(compiled.word_cuts, encoded[words], side='right')
+            scores[words] = np.asarray(compiled.word_scores, dtype=np.float64)[lookup]
+        
+        selections = kinds == _KIND_SELECTIONS
+        if selections.any():
+            lookup = np.minimum(encoded[selections], compiled.max_selections).astype(np.intp)
+            scores[selections] = np.asarray(compiled.selection_scores, dtype=np.float64)[lookup]
+        
+        for col, field in enumerate(fields):
+            numeric_rule = field[4]
+            if numeric_rule is None:
+                continue
+            mask = kinds[:, col] == _KIND_NUMERIC
+            if not mask.any():
+                continue
+            search, cuts, rule_scores, fallback = numeric_rule
+            values = encoded[mask, col]
+            side = 'right' if search is bisect_right else 'left'
+            lookup = np.searchsorted(cuts, values, side=side)
+            column = np.asarray(rule_scores, dtype=np.float64)[lookup]
+            scores[mask, col] = np.where(np.isnan(values), fallback, column)
+        
+        # Section sums and counts via a field -> section membership matrix
+        membership = np.zeros((n_fields, len(sections)), dtype=np.float64)
+        for col, field in enumerate(fields):
+            membership[col, field[1]] = 1.0
+        present = (kinds != _KIND_ABSENT).astype(np.float64)
+        sums = scores @ membership
+        counts = present @ membership
+        averages = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        
+        # Accumulate in section order so floating point results match the scalar path
+        totals = np.zeros(n_rows, dtype=np.float64)
+        for index, weight in enumerate(weights):
+            totals = totals + averages[:, index] * weight
+        finals = totals / total_weight if total_weight > 0 else np.zeros(n_rows)
+        finals = np.clip(finals, 0, 100)
+        verdict_indexes = np.searchsorted(compiled.verdict_cuts, finals, side='right').tolist()
+        
+        # Convert back to Python floats so rounding matches the scalar path exactly
+        averages = averages.tolist()
+        has_fields = (counts > 0).tolist()
+        totals = totals.tolist()
+        
+        results = []
+        for row in range(n_rows):
+            if failed[row]:
+                results.append({
+                    'total_score': 0,
+                    'section_scores': {},
+                    'verdict': {'emoji': '⚠️', 'text': 'Error in calculation', 'category': 'error'}
+                })
+                continue
+            row_averages = averages[row]
+            row_has_fields = has_fields[row]
+            section_scores = {
+                section: round(row_averages[index], 1) if row_has_fields[index] else 0
+                for index, section in enumerate(sections)
+            }
+            final_score = min(100, max(0, totals[row] / total_weight)) if total_weight > 0 else 0
+            results.append({
+                'total_score': round(final_score, 1),
+                'section_scores': section_scores,
+                'verdict': dict(compiled.verdict_table[verdict_indexes[row]])
+            })
+        
+        return results
     
-    def _calculate_business_model_score(self, form_data: Dict[str, Any]) -> float:
-        """Calculate business model score."""
-        business_fields = ['revenue-model', 'pricing-strategy', 'unit-economics-visibility', 'scalability']
-        return self._calculate_section_average(form_data, business_fields)
+    def _lookup_column(self, table: Dict[str, int], values: List[Any], failed: List[bool]) -> List[Any]:
+        """Look up a column of values in a field's scoring table, flagging unscorable rows."""
+        try:
+            return [table.get(value) for value in values]
+        except TypeError:
+            # Unhashable values fail the scalar path too; find and flag the offending rows
+            direct = []
+            for row, value in enumerate(values):
+                try:
+                    direct.append(table.get(value))
+                except TypeError as e:
+                    logger.error(f"Error calculating score: {str(e)}")
+                    failed[row] = True
+                    direct.append(None)
+            return direct
     
-    def _calculate_traction_score(self, form_data: Dict[str, Any], startup_type: str) -> float:
-        """Calculate validation & traction score."""
-        traction_fields = ['validation-type', 'customer-count']
-        return self._calculate_section_average(form_data, traction_fields)
+    def _encode_column(self, values: List[Any], is_text: bool, numeric_rule: Tuple) -> Tuple[List[int], List[float]]:
+        """Encode values outside the scoring matrix, with fast paths for single-typed columns."""
+        value_types = set(map(type, values))
+        if len(value_types) == 1:
+            value_type = next(iter(value_types))
+            if value_type is str:
+                if is_text:
+                    return [_KIND_WORDS] * len(values), [len(value.split()) for value in values]
+                return [_KIND_SCORE] * len(values), [5] * len(values)
+            if value_type is list:
+                return [_KIND_SELECTIONS] * len(values), [len(value) for value in values]
+        if numeric_rule is not None and value_types <= {int, float}:
+            try:
+                return [_KIND_NUMERIC] * len(values), [float(value) for value in values]
+            except OverflowError:
+                pass
+        
+        cells = [self._encode_value(value, is_text, numeric_rule) for value in values]
+        return [kind for kind, _ in cells], [cell for _, cell in cells]
     
-    def _calculate_unit_economics_score(self, form_data: Dict[str, Any]) -> float:
-        """Calculate unit economics score for launched startups."""
-        unit_fields = ['cac', 'ltv', 'payback-period', 'gross-margin', 'churn-rate']
-        return self._calculate_section_average(form_data, unit_fields)
+    def _encode_value(self, value: Any, is_text: bool, numeric_rule: Tuple) -> Tuple[int, float]:
+        """Encode a value outside the scoring matrix as a ``(kind, value)`` cell."""
+        if isinstance(value, str):
+            if is_text:
+                return _KIND_WORDS, len(value.split())
+            return _KIND_SCORE, 5
+        if isinstance(value, list):
+            return _KIND_SELECTIONS, len(value)
+        if isinstance(value, (int, float)) and numeric_rule is not None:
+            try:
+                return _KIND_NUMERIC, float(value)
+            except OverflowError:  # Integers beyond float range compare like infinities
+                return _KIND_NUMERIC, float('inf') if value > 0 else float('-inf')
+        return _KIND_SCORE, 5
     
-    def _calculate_financials_score(self, form_data: Dict[str, Any]) -> float:
-        """Calculate financials & capital score for launched startups."""
-        financial_fields = ['mrr', 'growth-rate', 'runway', 'funding-amount', 'use-of-funds']
-        return self._calculate_section_average(form_data, financial_fields)
+    def _get_field_score(self, field_id: str, value: Any) -> float:
+        """Get score for a specific field value."""
+        compiled = self._compiled()
+        _, _, table, is_text, numeric_rule = compiled.compile_field(field_id, 0)
+        if table is not None and value in table:
+            return table[value]
+        return self._get_dynamic_score(compiled, value, is_text, numeric_rule)
     
-    def _calculate_section_average(self, form_data: Dict[str, Any], fields: List[str]) -> float:
-        """Calculate average score for a section's fields."""
-        scores = []
-        for field in fields:
-            if field in form_data and form_data[field] is not None:
-                score = self._get_field_score(field, form_data[field])
-                scores.append(score)
+    def _get_dynamic_score(self, compiled: _CompiledRules, value: Any, is_text: bool, numeric_rule: Tuple) -> float:
+        """Calculate dynamic score for values not in the scoring matrix."""
+        if isinstance(value, str):
+            if is_text:
+                return compiled.word_scores[bisect_right(compiled.word_cuts, len(value.split()))]
+            return 5
+        
+        if isinstance(value, list):  # For checkbox fields
+            return compiled.selection_scores[min(len(value), compiled.max_selections)]
+        
+        if isinstance(value, (int, float)):
+            if numeric_rule is None:
+                return 5
+            search, cuts, scores, fallback = numeric_rule
+            if value != value:  # NaN fails every threshold comparison
+                return fallback
+            return scores[search(cuts, value)]
         
-        return sum(scores) / len(scores) if scores else 0
+        return 5  # Default score
     
-    def _generate_verdict(self, score: float) -> Dict[str, str]:
+    def _generate_verdict(self, compiled: _CompiledRules, score: float) -> Dict[str, str]:
         """Generate verdict based on score."""
-        if score >= 90:
-            return {'emoji': '🦄', 'text': 'Unicorn Potential', 'category': 'unicorn'}
-        elif score >= 80:
-            return {'emoji': '🚀', 'text': 'Strong Candidate', 'category': 'strong'}
-        elif score >= 70:
-            return {'emoji': '📈', 'text': 'Promising but Needs Work', 'category': 'promising'}
-        elif score >= 60:
-            return {'emoji': '🔧', 'text': 'Early Potential', 'category': 'early'}
-        else:
-            return {'emoji': '⚠️', 'text': 'Not Investment-Ready', 'category': 'not-ready'}
\ No newline at end of file
+        return dict(compiled.verdict_table[bisect_right(compiled.verdict_cuts, score)])
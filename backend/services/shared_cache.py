@@ -0,0 +1,132 @@
+from typing import Dict, Any, Optional
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SharedCache:
+    # Optional tier shared by all workers, on a local Redis-compatible server (SHARED_CACHE_URL).
+    # Every call degrades to a miss or no-op when it is disabled or unreachable, so callers keep using Mongo.
+    def __init__(self, url: Optional[str] = None, timeout_seconds: Optional[float] = None,
+                 retry_after_seconds: Optional[float] = None, key_prefix: str = 'vc:'):
+        self.url = url if url is not None else os.getenv('SHARED_CACHE_URL', '')
+        # A local server answers in well under a millisecond; anything slower is treated as down
+        self.timeout_seconds = timeout_seconds or float(os.getenv('SHARED_CACHE_TIMEOUT_SECONDS', '0.05'))
+        # After an error the tier is skipped for this long instead of adding a timeout to every request
+        self.retry_after_seconds = retry_after_seconds or float(os.getenv('SHARED_CACHE_RETRY_SECONDS', '5'))
+        self.key_prefix = key_prefix
+        
+        self._client = None
+        self._down_until = 0.0
+        self.counters = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'errors': 0,
+            'skipped_while_down': 0
+        }
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether a shared server is configured; it may still be temporarily down."""
+        return self._client is not None
+    
+    async def connect(self):
+        """Create the client (idempotent); without SHARED_CACHE_URL or the redis package everything stays per process."""
+        if not self.url or self._client is not None:
+            return
+        try:
+            # Optional dependency, only imported when a shared cache is configured
+            import redis.asyncio as redis
+        except ImportError:
+            logger.warning("SHARED_CACHE_URL is set but the redis package is not installed; using Mongo only")
+            return
+        
+        self._client = redis.from_url(
+            self.url, socket_timeout=self.timeout_seconds, socket_connect_timeout=self.timeout_seconds
+        )
+        if await self._call('ping', self._client.ping()) is None:
+            logger.warning(f"Shared cache at {self.url} is unreachable; retrying every {self.retry_after_seconds}s")
+        else:
+            logger.info(f"Shared cache connected at {self.url}")
+    
+    async def close(self):
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.error(f"Closing shared cache failed: {str(e)}")
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes, or None when missing or the cache is unavailable."""
+        if not self._available():
+            return None
+        value = await self._call('get', self._client.get(self.key_prefix + key))
+        self.counters['hits' if value is not None else 'misses'] += 1
+        return value
+    
+    async def set(self, key: str, value: bytes, ttl_seconds: float, only_if_absent: bool = False) -> bool:
+        """Store ``value`` for ``ttl_seconds``; with ``only_if_absent`` an existing value is kept."""
+        if not self._available():
+            return False
+        stored = await self._call('set', self._client.set(
+            self.key_prefix + key, value, px=max(1, int(ttl_seconds * 1000)), nx=only_if_absent
+        ))
+        if stored:
+            self.counters['writes'] += 1
+        return bool(stored)
+    
+    async def delete(self, key: str) -> bool:
+        """Remove ``key``; False when the cache is unavailable (the entry may outlive its invalidation)."""
+        if not self._available():
+            return False
+        return await self._call('delete', self._client.delete(self.key_prefix + key)) is not None
+    
+    async def incr(self, key: str, expire_at: float) -> Optional[int]:
+        """Atomically increment a counter that expires at the ``expire_at`` epoch; None when unavailable."""
+        if not self._available():
+            return None
+        
+        async def increment():
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.incr(self.key_prefix + key)
+                pipe.expireat(self.key_prefix + key, int(expire_at))
+                count, _ = await pipe.execute()
+            return count
+        
+        count = await self._call('incr', increment())
+        if count is not None:
+            self.counters['writes'] += 1
+        return count
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return connection state and counters."""
+        return {
+            'enabled': self.enabled,
+            'available': self.enabled and time.monotonic() >= self._down_until,
+            **self.counters
+        }
+    
+    def _available(self) -> bool:
+        if self._client is None:
+            return False
+        if time.monotonic() < self._down_until:
+            self.counters['skipped_while_down'] += 1
+            return False
+        return True
+    
+    async def _call(self, operation: str, awaitable) -> Any:
+        """Await a cache call; errors mark the cache down for retry_after_seconds and return None."""
+        try:
+            return await awaitable
+        except Exception as e:
+            self.counters['errors'] += 1
+            if time.monotonic() >= self._down_until:
+                logger.warning(f"Shared cache {operation} failed, falling back for {self.retry_after_seconds}s: {str(e)}")
+            self._down_until = time.monotonic() + self.retry_after_seconds
+            return None
+
+shared_cache = SharedCache()
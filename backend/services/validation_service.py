@@ -1,68 +1,136 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+import os
 import re
 import time
+from functools import lru_cache
 from datetime import datetime, timedelta
 import logging
 
+from services.cache import TTLCache, content_hash
+from services.metrics import metrics
+from services.rules import Rules, rules_provider
+
 logger = logging.getLogger(__name__)
 
+# Precompiled once at import. The literal-led patterns stay separate because CPython's
+# regex engine only uses its fast literal scan for a pattern without alternation.
+SUSPICIOUS_TEXT_PATTERNS = [
+    re.compile(r'test\s*test\s*test', re.IGNORECASE),
+    re.compile(r'lorem\s*ipsum', re.IGNORECASE),
+    re.compile(r'asdf', re.IGNORECASE)
+]
+REPEATED_CHARACTERS_PATTERN = re.compile(r'(.)\1{10,}', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+HTML_TAG_PATTERN = re.compile(r'<[^>]*>')
+
+@lru_cache(maxsize=1024)
+def _is_select_field(key: str) -> bool:
+    """Whether a string-valued field counts as a single-choice selection (memoized per field name)."""
+    if key.startswith('_') or key.endswith(('textarea', 'segment', 'proposition', 'strategy', 'funds')):
+        return False
+    return 'select' in key or 'radio' in key or key in ('team-size', 'market-size-tam', 'market-size-som')
+
 class ValidationService:
-    def __init__(self):
-        self.required_fields = {
-            'idea': [
-                'team-size', 'founder-experience', 'technical-expertise', 'domain-expertise', 
-                'commitment-level', 'market-size-tam', 'market-size-som', 'market-growth', 
-                'market-timing', 'customer-segment', 'problem-severity', 'problem-frequency', 
-                'current-solution', 'solution-uniqueness', 'value-proposition', 'defensibility', 
-                'ip-protection', 'competitive-timeline', 'revenue-model', 'pricing-strategy', 
-                'unit-economics-visibility', 'scalability', 'validation-type', 'customer-count'
-            ],
-            'launched': [
-                'team-size', 'founder-experience', 'technical-expertise', 'domain-expertise', 
-                'commitment-level', 'market-size-tam', 'market-size-som', 'market-growth', 
-                'market-timing', 'customer-segment', 'problem-severity', 'problem-frequency', 
-                'current-solution', 'solution-uniqueness', 'value-proposition', 'defensibility', 
-                'ip-protection', 'competitive-timeline', 'revenue-model', 'pricing-strategy', 
-                'unit-economics-visibility', 'scalability', 'validation-type', 'customer-count',
-                'cac', 'ltv', 'payback-period', 'gross-margin', 'churn-rate', 'mrr', 
-                'growth-rate', 'runway', 'funding-amount', 'use-of-funds'
-            ]
-        }
-        
-        self.min_completion_time_ms = 180000  # 3 minutes
-        self.max_submissions_per_day = 2
+    def __init__(self, rules: Optional[Rules] = None):
+        # Validation limits come from the shared, hot-reloadable rules unless pinned for this instance
+        self._pinned_rules = rules
+        
+        # Sanitized data and static validation results shared between /validate and /evaluate
+        self.validation_cache = TTLCache(
+            maxsize=int(os.getenv('VALIDATION_CACHE_SIZE', '1024')),
+            ttl_seconds=float(os.getenv('VALIDATION_CACHE_TTL_SECONDS', '600'))
+        )
+    
+    @property
+    def rules(self) -> Rules:
+        return self._pinned_rules or rules_provider.current
+    
+    @property
+    def required_fields(self) -> Mapping[str, Tuple[str, ...]]:
+        return self.rules.validation['required_fields']
+    
+    @property
+    def numeric_ranges(self) -> Mapping[str, Tuple[float, float]]:
+        return self.rules.validation['numeric_ranges']
+    
+    @property
+    def text_length_ranges(self) -> Mapping[str, Tuple[int, int]]:
+        return self.rules.validation['text_length_ranges']
+    
+    @property
+    def min_completion_time_ms(self) -> int:
+        return self.rules.validation['min_completion_time_ms']
+    
+    @property
+    def max_submissions_per_day(self) -> int:
+        return self.rules.validation['max_submissions_per_day']
+    
+    def sanitize_and_validate(self, form_data: Dict[str, Any], session_metadata: Dict[str, Any],
+                              startup_type: str) -> Tuple[Dict[str, Any], bool, List[str], List[str]]:
+        """Sanitize and validate a raw submission, reusing cached work for repeated payloads.
+        
+        The frontend posts the same payload to /validate and then /evaluate, so the
+        sanitized data and the static checks are cached by a hash of
+        ``(rules version, form_data, startup_type)``. The time-dependent completion check always runs fresh.
+        """
+        cache_key = content_hash(self.rules.version, form_data, startup_type)
+        cached = self.validation_cache.get(cache_key)
+        
+        if cached is None:
+            with metrics.span('validation.sanitize'):
+                sanitized_data = self.sanitize_form_data(form_data)
+            try:
+                with metrics.span('validation.static_checks'):
+                    static_results = self._validate_static(sanitized_data, startup_type)
+            except Exception as e:
+                logger.error(f"Validation error: {str(e)}")
+                return sanitized_data, False, ["Validation system error"], ["System error detected"]
+            cached = (sanitized_data, static_results)
+            self.validation_cache.set(cache_key, cached)
+        
+        sanitized_data, (validation_errors, pre_time_flags, post_time_flags) = cached
+        anti_gaming_flags = pre_time_flags + self._check_completion_time(session_metadata) + post_time_flags
+        is_valid = len(validation_errors) == 0 and len(anti_gaming_flags) == 0
+        
+        # Callers get their own copies; the cached entry stays untouched
+        return dict(sanitized_data), is_valid, list(validation_errors), anti_gaming_flags
     
     def validate_submission(self, form_data: Dict[str, Any], session_metadata: Dict[str, Any], 
                           startup_type: str) -> Tuple[bool, List[str], List[str]]:
         """Comprehensive validation of form submission."""
-        validation_errors = []
-        anti_gaming_flags = []
-        
         try:
-            # Basic field validation
-            field_errors = self._validate_required_fields(form_data, startup_type)
-            validation_errors.extend(field_errors)
-            
-            # Data type and format validation
-            format_errors = self._validate_data_formats(form_data)
-            validation_errors.extend(format_errors)
-            
-            # Cross-field validation
-            logic_errors = self._validate_business_logic(form_data)
-            validation_errors.extend(logic_errors)
+            validation_errors, pre_time_flags, post_time_flags = self._validate_static(form_data, startup_type)
             
             # Anti-gaming checks
-            gaming_flags = self._check_anti_gaming(form_data, session_metadata)
-            anti_gaming_flags.extend(gaming_flags)
+            anti_gaming_flags = pre_time_flags + self._check_completion_time(session_metadata) + post_time_flags
             
             is_valid = len(validation_errors) == 0 and len(anti_gaming_flags) == 0
             
             return is_valid, validation_errors, anti_gaming_flags
-            
+        
         except Exception as e:
             logger.error(f"Validation error: {str(e)}")
             return False, ["Validation system error"], ["System error detected"]
     
+    def _validate_static(self, form_data: Dict[str, Any], startup_type: str) -> Tuple[List[str], List[str], List[str]]:
+        """Run every check that depends only on the form data.
+        
+        Returns the validation errors and the anti-gaming flags that come before and
+        after the completion-time flag, so the combined flag order is unchanged.
+        """
+        validation_errors = []
+        
+        # Basic field validation
+        validation_errors.extend(self._validate_required_fields(form_data, startup_type))
+        
+        # Data type and format validation
+        validation_errors.extend(self._validate_data_formats(form_data))
+        
+        # Cross-field validation
+        validation_errors.extend(self._validate_business_logic(form_data))
+        
+        return validation_errors, self._check_honeypot(form_data), self._check_content_flags(form_data)
+    
     def _validate_required_fields(self, form_data: Dict[str, Any], startup_type: str) -> List[str]:
         """Validate that all required fields are present and not empty."""
         errors = []
@@ -81,25 +149,14 @@ class ValidationService:
         
         # Email validation
         email_fields = ['founder-email', 'contact-email']
-        email_regex = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
         
         for field in email_fields:
             if field in form_data and form_data[field]:
-                if not email_regex.match(str(form_data[field])):
+                if not EMAIL_PATTERN.match(str(form_data[field])):
                     errors.append(f"Invalid email format in '{field}'")
         
         # Numeric validation
-        numeric_fields = {
-            'cac': (0, 10000),
-            'ltv': (0, 50000),
-            'payback-period': (0, 60),
-            'gross-margin': (0, 100),
-            'churn-rate': (0, 100),
-            'growth-rate': (-50, 150),
-            'runway': (0, 120)
-        }
-        
-        for field, (min_val, max_val) in numeric_fields.items():
+        for field, (min_val, max_val) in self.numeric_ranges.items():
             if field in form_data and form_data[field] is not None:
                 try:
                     value = float(form_data[field])
@@ -109,14 +166,7 @@ class ValidationService:
                     errors.append(f"Invalid numeric value for '{field}'")
         
         # Text length validation
-        text_fields = {
-            'customer-segment': (20, 1000),
-            'value-proposition': (20, 1000),
-            'pricing-strategy': (20, 1000),
-            'use-of-funds': (20, 1000)
-        }
-        
-        for field, (min_len, max_len) in text_fields.items():
+        for field, (min_len, max_len) in self.text_length_ranges.items():
             if field in form_data and form_data[field]:
                 length = len(str(form_data[field]))
                 if not (min_len <= length <= max_len):
@@ -166,13 +216,19 @@ class ValidationService:
     
     def _check_anti_gaming(self, form_data: Dict[str, Any], session_metadata: Dict[str, Any]) -> List[str]:
         """Check for anti-gaming violations."""
-        flags = []
-        
-        # Check honeypot field
+        return (self._check_honeypot(form_data)
+                + self._check_completion_time(session_metadata)
+                + self._check_content_flags(form_data))
+    
+    def _check_honeypot(self, form_data: Dict[str, Any]) -> List[str]:
+        """Check the honeypot field."""
         if form_data.get('_bot_field'):
-            flags.append("Bot detection triggered")
-        
-        # Check completion time (minimum 3 minutes)
+            return ["Bot detection triggered"]
+        return []
+    
+    def _check_completion_time(self, session_metadata: Dict[str, Any]) -> List[str]:
+        """Check completion time (minimum 3 minutes)."""
+        flags = []
         start_time = session_metadata.get('start_time')
         if start_time:
             try:
@@ -182,6 +238,12 @@ class ValidationService:
             except (ValueError, TypeError):
                 pass
         
+        return flags
+    
+    def _check_content_flags(self, form_data: Dict[str, Any]) -> List[str]:
+        """Check text responses and selections for suspicious content."""
+        flags = []
+        
         # Check for suspicious patterns in text responses
         text_fields = ['customer-segment', 'value-proposition', 'pricing-strategy', 'use-of-funds']
         for field in text_fields:
@@ -198,39 +260,26 @@ class ValidationService:
     
     def _detect_suspicious_text(self, text: str) -> bool:
         """Detect suspicious text patterns."""
-        suspicious_patterns = [
-            r'test\s*test\s*test',
-            r'lorem\s*ipsum',
-            r'asdf+',
-            r'^(.)\1{10,}',  # Repeated characters
-            r'^\s*$',  # Empty or whitespace only
-        ]
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
+        # Check for very short responses (this also covers empty or whitespace-only text)
+        if len(text.split()) < 3:
+            return True
         
-        # Check for very short responses
-        words = text.strip().split()
-        if len(words) < 3:
+        # Repeated characters at the start of the response
+        if REPEATED_CHARACTERS_PATTERN.match(text):
             return True
         
+        for pattern in SUSPICIOUS_TEXT_PATTERNS:
+            if pattern.search(text):
+                return True
+        
         return False
     
     def _check_repeated_values(self, form_data: Dict[str, Any]) -> bool:
         """Check for suspiciously repeated identical values."""
-        select_values = []
-        radio_values = []
-        
-        for key, value in form_data.items():
-            if key.startswith('_') or value is None:
-                continue
-                
-            if isinstance(value, str) and not key.endswith(('textarea', 'segment', 'proposition', 'strategy', 'funds')):
-                if 'select' in key or 'radio' in key or key in ['team-size', 'market-size-tam', 'market-size-som']:
-                    select_values.append(value)
-                else:
-                    radio_values.append(value)
+        select_values = [
+            value for key, value in form_data.items()
+            if isinstance(value, str) and _is_select_field(key)
+        ]
         
         # Check if too many identical selections (suspicious)
         if select_values and len(set(select_values)) / len(select_values) < 0.3:
@@ -242,12 +291,13 @@ class ValidationService:
         """Sanitize input to prevent XSS and injection attacks."""
         if isinstance(value, str):
             # Basic XSS prevention
-            value = re.sub(r'<[^>]*>', '', value)  # Remove HTML tags
-            value = value.replace('&', '&amp;')
-            value = value.replace('<', '&lt;')
-            value = value.replace('>', '&gt;')
-            value = value.replace('"', '&quot;')
-            value = value.replace("'", '&#x27;')
+            if '<' in value:
+                value = HTML_TAG_PATTERN.sub('', value)  # Remove HTML tags
+            value = (value.replace('&', '&amp;')
+                          .replace('<', '&lt;')
+                          .replace('>', '&gt;')
+                          .replace('"', '&quot;')
+                          .replace("'", '&#x27;'))
         
         return value
     
@@ -0,0 +1,240 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import os
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+WebhookHandler = Callable[[AsyncIOMotorDatabase, Dict[str, Any]], Awaitable[None]]
+
+class WebhookInbox:
+    # Durable Stripe event inbox: the endpoint persists events, background consumers process them
+    def __init__(self, collection_name: str = 'webhook_events', dead_letter_collection_name: str = 'webhook_dead_letters',
+                 consumers: Optional[int] = None, max_attempts: Optional[int] = None,
+                 retry_base_seconds: Optional[float] = None, retry_max_seconds: Optional[float] = None,
+                 lease_seconds: Optional[float] = None, poll_interval_seconds: Optional[float] = None,
+                 retention_seconds: Optional[int] = None):
+        self.collection_name = collection_name
+        self.dead_letter_collection_name = dead_letter_collection_name
+        self.consumers = consumers or int(os.getenv('WEBHOOK_CONSUMERS', '4'))
+        self.max_attempts = max_attempts or int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '5'))
+        self.retry_base_seconds = retry_base_seconds or float(os.getenv('WEBHOOK_RETRY_BASE_SECONDS', '2'))
+        self.retry_max_seconds = retry_max_seconds or float(os.getenv('WEBHOOK_RETRY_MAX_SECONDS', '300'))
+        # A job whose consumer died is picked up again once its lease runs out
+        self.lease_seconds = lease_seconds or float(os.getenv('WEBHOOK_LEASE_SECONDS', '60'))
+        # Consumers also poll, for retries coming due and events inserted by other processes
+        self.poll_interval_seconds = poll_interval_seconds or float(os.getenv('WEBHOOK_POLL_INTERVAL_SECONDS', '1'))
+        # Processed events are kept this long so Stripe's redeliveries are still recognised as duplicates
+        self.retention_seconds = retention_seconds or int(os.getenv('WEBHOOK_RETENTION_SECONDS', '604800'))
+        
+        self.handlers: Dict[str, WebhookHandler] = {}
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.counters = {
+            'received': 0,
+            'duplicates': 0,
+            'processed': 0,
+            'retried': 0,
+            'dead_lettered': 0,
+            'errors': 0
+        }
+    
+    def register_handler(self, event_type: str, handler: WebhookHandler):
+        """Process events of ``event_type`` with ``handler(db, event)``; handlers must be idempotent."""
+        self.handlers[event_type] = handler
+    
+    def index_plan(self) -> Dict[str, List[IndexModel]]:
+        """Indexes for claiming due and expired jobs, plus a TTL index for processed events."""
+        return {
+            self.collection_name: [
+                IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name='status_next_attempt_at'),
+                IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)], name='status_locked_until'),
+                IndexModel([("expires_at", ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0)
+            ]
+        }
+    
+    async def enqueue(self, db: AsyncIOMotorDatabase, event_id: str, event_type: str, data: Dict[str, Any]) -> bool:
+        """Persist an event for processing; False when it was already received (Stripe redelivery).
+        
+        Events without a registered handler are acknowledged without being stored.
+        """
+        if event_type not in self.handlers:
+            return False
+        
+        now = datetime.utcnow()
+        try:
+            await db[self.collection_name].insert_one({
+                "_id": event_id,
+                "type": event_type,
+                "data": data,
+                "status": "pending",
+                "attempts": 0,
+                "received_at": now,
+                "next_attempt_at": now
+            })
+        except DuplicateKeyError:
+            self.counters['duplicates'] += 1
+            return False
+        
+        self.counters['received'] += 1
+        if self._wake is not None:
+            self._wake.set()
+        return True
+    
+    def start(self, db: AsyncIOMotorDatabase):
+        """Start the consumer tasks (idempotent)."""
+        if self._tasks:
+            return
+        self._db = db
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._consume(), name=f'webhook-consumer-{index}')
+            for index in range(self.consumers)
+        ]
+        logger.info(f"Webhook inbox started with {self.consumers} consumers")
+    
+    async def close(self, timeout_seconds: float = 5):
+        """Let consumers finish their current job, then stop them; unfinished jobs are retried after their lease."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wake.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return consumer settings and counters."""
+        return {
+            'consumers': len(self._tasks),
+            'max_attempts': self.max_attempts,
+            **self.counters
+        }
+    
+    async def _consume(self):
+        while not self._stopping:
+            # Clear before claiming so an enqueue during the claim still wakes this consumer
+            self._wake.clear()
+            try:
+                job = await self._claim()
+            except Exception as e:
+                self.counters['errors'] += 1
+                logger.error(f"Webhook inbox claim failed: {str(e)}")
+                job = None
+            
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            await self._process(job)
+    
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest due job, or one whose consumer's lease expired.
+        
+        Every claim counts as an attempt, so a job that keeps outliving its lease is dead-lettered too.
+        """
+        now = datetime.utcnow()
+        return await self._db[self.collection_name].find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    {"status": "processing", "locked_until": {"$lte": now}}
+                ]
+            },
+            {
+                "$set": {"status": "processing", "locked_until": now + timedelta(seconds=self.lease_seconds)},
+                "$inc": {"attempts": 1}
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def _process(self, job: Dict[str, Any]):
+        collection = self._db[self.collection_name]
+        if job['attempts'] > self.max_attempts:
+            # Reclaimed after the consumer of its last allowed attempt died or hung past the lease
+            await self._fail(job, TimeoutError(f"lease expired on attempt {job['attempts'] - 1} of {self.max_attempts}"))
+            return
+        
+        try:
+            await self.handlers[job['type']](self._db, job)
+        except Exception as e:
+            await self._fail(job, e)
+            return
+        
+        try:
+            now = datetime.utcnow()
+            await collection.update_one(
+                {"_id": job['_id']},
+                {
+                    "$set": {
+                        "status": "done",
+                        "processed_at": now,
+                        "expires_at": now + timedelta(seconds=self.retention_seconds)
+                    },
+                    "$unset": {"locked_until": "", "last_error": ""}
+                }
+            )
+            self.counters['processed'] += 1
+        except Exception as e:
+            # The handler is idempotent, so the job simply runs again after its lease
+            self.counters['errors'] += 1
+            logger.error(f"Marking webhook event {job['_id']} done failed: {str(e)}")
+    
+    async def _fail(self, job: Dict[str, Any], error: Exception):
+        collection = self._db[self.collection_name]
+        logger.error(f"Webhook event {job['_id']} ({job['type']}) failed on attempt {job['attempts']}: {str(error)}")
+        try:
+            if job['attempts'] >= self.max_attempts:
+                dead_letter = {**job, "status": "dead", "last_error": str(error), "dead_lettered_at": datetime.utcnow()}
+                dead_letter.pop('locked_until', None)
+                await self._db[self.dead_letter_collection_name].replace_one({"_id": job['_id']}, dead_letter, upsert=True)
+                # Keep a tombstone so redeliveries of a dead event aren't processed again
+                await collection.update_one(
+                    {"_id": job['_id']},
+                    {
+                        "$set": {
+                            "status": "dead",
+                            "last_error": str(error),
+                            "expires_at": datetime.utcnow() + timedelta(seconds=self.retention_seconds)
+                        },
+                        "$unset": {"locked_until": "", "data": ""}
+                    }
+                )
+                self.counters['dead_lettered'] += 1
+                return
+            
+            # Exponential backoff with jitter so a failing dependency isn't hammered in lockstep
+            delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (job['attempts'] - 1))
+            delay *= random.uniform(0.5, 1.0)
+            await collection.update_one(
+                {"_id": job['_id']},
+                {
+                    "$set": {
+                        "status": "pending",
+                        "last_error": str(error),
+                        "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay)
+                    },
+                    "$unset": {"locked_until": ""}
+                }
+            )
+            self.counters['retried'] += 1
+        except Exception as e:
+            self.counters['errors'] += 1
+            logger.error(f"Rescheduling webhook event {job['_id']} failed: {str(e)}")
+
+webhook_inbox = WebhookInbox()
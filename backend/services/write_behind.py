@@ -0,0 +1,141 @@
+from typing import Dict, Any, List, Optional, Tuple
+import os
+import asyncio
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindInserter:
+    # Coalesces concurrent inserts into one collection into insert_many(ordered=False) batches
+    def __init__(self, collection_name: str, enabled: Optional[bool] = None, durable: Optional[bool] = None,
+                 max_batch_size: Optional[int] = None, max_delay_ms: Optional[float] = None,
+                 max_queue_size: Optional[int] = None):
+        if enabled is None:
+            enabled = os.getenv('WRITE_BEHIND_ENABLED', 'false').lower() == 'true'
+        if durable is None:
+            durable = os.getenv('WRITE_BEHIND_DURABLE', 'true').lower() == 'true'
+        self.collection_name = collection_name
+        self.enabled = enabled
+        # Durable callers wait for their batch to be acknowledged (group commit); others return once queued
+        self.durable = durable
+        self.max_batch_size = max_batch_size or int(os.getenv('WRITE_BEHIND_MAX_BATCH_SIZE', '100'))
+        self.max_delay_ms = max_delay_ms or float(os.getenv('WRITE_BEHIND_MAX_DELAY_MS', '5'))
+        self.max_queue_size = max_queue_size or int(os.getenv('WRITE_BEHIND_MAX_QUEUE_SIZE', '1000'))
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._closing = False
+        self.counters = {
+            'queued': 0,
+            'batches': 0,
+            'inserted': 0,
+            'failed': 0,
+            'largest_batch': 0
+        }
+    
+    async def insert(self, db: AsyncIOMotorDatabase, document: Dict[str, Any], durable: Optional[bool] = None):
+        """Insert a document, batched with concurrent inserts when write-behind is enabled.
+        
+        With ``durable`` (the default from WRITE_BEHIND_DURABLE) this returns only after the
+        batch containing the document is acknowledged and raises if the document was rejected.
+        A full queue makes callers wait, which pushes back on request handlers under burst load.
+        """
+        if not self.enabled or self._closing:
+            await db[self.collection_name].insert_one(document)
+            return
+        
+        if self._flusher is None:
+            self._start(db)
+        
+        durable = self.durable if durable is None else durable
+        acknowledged = asyncio.get_running_loop().create_future() if durable else None
+        await self._queue.put((document, acknowledged))
+        self.counters['queued'] += 1
+        
+        if acknowledged is not None:
+            await acknowledged
+    
+    async def close(self):
+        """Flush everything still queued and stop the flusher."""
+        self._closing = True
+        if self._flusher is None:
+            return
+        await self._queue.join()
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+        logger.info(f"Write-behind queue for {self.collection_name} flushed")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return queue settings, depth and counters."""
+        return {
+            'enabled': self.enabled,
+            'durable': self.durable,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'max_queue_size': self.max_queue_size,
+            **self.counters
+        }
+    
+    def _start(self, db: AsyncIOMotorDatabase):
+        self._db = db
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._flusher = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        """Flush when a batch fills up or max_delay_ms after its first document, whichever comes first."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay_ms / 1000
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]):
+        documents = [document for document, _ in batch]
+        errors: Dict[int, Exception] = {}
+        
+        try:
+            await self._db[self.collection_name].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Unordered inserts keep going past bad documents; fail only the rejected ones
+            for write_error in e.details.get('writeErrors', []):
+                errors[write_error['index']] = BulkWriteError({'writeErrors': [write_error]})
+        except Exception as e:
+            errors = {index: e for index in range(len(batch))}
+        
+        self.counters['batches'] += 1
+        self.counters['largest_batch'] = max(self.counters['largest_batch'], len(batch))
+        self.counters['inserted'] += len(batch) - len(errors)
+        self.counters['failed'] += len(errors)
+        if errors:
+            logger.error(f"Write-behind insert into {self.collection_name} failed for {len(errors)} of {len(batch)} documents")
+        
+        for index, (_, acknowledged) in enumerate(batch):
+            if acknowledged is None or acknowledged.done():
+                continue
+            if index in errors:
+                acknowledged.set_exception(errors[index])
+            else:
+                acknowledged.set_result(None)
+
+evaluation_writer = WriteBehindInserter('vc_evaluations')
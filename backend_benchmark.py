@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the pure backend services.
+
+Times ScoringEngine, ValidationService and AnalysisGenerator over a generated
+corpus of synthetic submissions that covers every scoring_matrix option, both
+startup types, multi-select, free-text and numeric fields. Reports ns/op and
+tracemalloc allocation figures per function.
+
+Results are written as JSON so runs can be compared between commits:
+    python backend_benchmark.py --output bench.json
+    python backend_benchmark.py --compare bench.json --max-regression 15
+
+Usage:
+    python backend_benchmark.py [--corpus-size 2000] [--repeat 5] [--filter scoring] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / 'backend'))
+
+from services.scoring_engine import ScoringEngine
+from services.validation_service import ValidationService
+from services.analysis_generator import AnalysisGenerator
+
+MULTI_SELECT_OPTIONS = {
+    'defensibility': ['network-effects', 'data-moats', 'switching-costs', 'brand', 'regulatory', 'technology'],
+    'validation-type': ['customer-interviews', 'surveys', 'pilot-customers', 'pre-orders', 'lois', 'paying-customers']
+}
+
+TEXT_FIELDS = ['customer-segment', 'value-proposition', 'pricing-strategy', 'use-of-funds']
+
+WORDS = (
+    "customers revenue platform market growth pricing subscription enterprise teams data "
+    "inventory forecasting margin retention pipeline integration analytics workflow onboarding"
+).split()
+
+# Launched-stage numeric fields with ranges that straddle every scoring threshold
+NUMERIC_RANGES = {
+    'cac': (10, 400),
+    'ltv': (50, 5000),
+    'payback-period': (1, 36),
+    'gross-margin': (10, 95),
+    'churn-rate': (0.5, 20),
+    'growth-rate': (1, 40),
+    'runway': (1, 36)
+}
+
+def generate_corpus(size: int, seed: int = 42) -> List[Tuple[Dict[str, Any], str]]:
+    """Build synthetic submissions; option indices rotate so every matrix option is used."""
+    rng = random.Random(seed)
+    matrix = ScoringEngine().scoring_matrix
+    corpus = []
+    
+    for i in range(size):
+        startup_type = 'launched' if i % 2 else 'idea'
+        form_data = {}
+        
+        for offset, (field_id, options) in enumerate(matrix.items()):
+            keys = list(options)
+            form_data[field_id] = keys[(i + offset) % len(keys)]
+        
+        for field_id, options in MULTI_SELECT_OPTIONS.items():
+            form_data[field_id] = rng.sample(options, rng.randint(0, 4))
+        
+        for field_id in TEXT_FIELDS:
+            form_data[field_id] = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 120)))
+        
+        if startup_type == 'launched':
+            for field_id, (low, high) in NUMERIC_RANGES.items():
+                value = rng.uniform(low, high)
+                form_data[field_id] = round(value, 1) if rng.random() < 0.5 else int(value)
+        
+        # Leave a few fields unanswered to exercise the absent-field paths
+        for field_id in rng.sample(sorted(form_data), rng.randint(0, 3)):
+            del form_data[field_id]
+        
+        corpus.append((form_data, startup_type))
+    return corpus
+
+def build_benchmarks(corpus: List[Tuple[Dict[str, Any], str]]) -> Dict[str, Tuple[Callable, List[tuple], int]]:
+    """Return name -> (function, argument tuples, operations per call)."""
+    scoring_engine = ScoringEngine()
+    validation_service = ValidationService()
+    analysis_generator = AnalysisGenerator()
+    session_metadata = {'user_uuid': 'bench', 'start_time': int(time.time() * 1000) - 300000}
+    
+    sanitized = [(validation_service.sanitize_form_data(form_data), startup_type) for form_data, startup_type in corpus]
+    scored = [(scoring_engine.calculate_score(form_data, startup_type), form_data, startup_type)
+              for form_data, startup_type in sanitized]
+    
+    batches = []
+    for startup_type in ('idea', 'launched'):
+        rows = [form_data for form_data, row_type in sanitized if row_type == startup_type]
+        batches.append((rows, startup_type))
+    
+    return {
+        'scoring.calculate_score': (
+            scoring_engine.calculate_score, sanitized, 1
+        ),
+        'scoring.calculate_scores_batch (per row)': (
+            scoring_engine.calculate_scores_batch, batches, len(sanitized) // len(batches)
+        ),
+        'validation.sanitize_form_data': (
+            validation_service.sanitize_form_data, [(form_data,) for form_data, _ in corpus], 1
+        ),
+        'validation.validate_submission': (
+            validation_service.validate_submission,
+            [(form_data, session_metadata, startup_type) for form_data, startup_type in sanitized], 1
+        ),
+        'analysis.generate_executive_summary': (
+            analysis_generator.generate_executive_summary,
+            [(result['total_score'], result['verdict'], form_data) for result, form_data, _ in scored], 1
+        ),
+        'analysis.generate_deep_analysis': (
+            analysis_generator.generate_deep_analysis,
+            [(result['total_score'], result['section_scores'], form_data, startup_type)
+             for result, form_data, startup_type in scored], 1
+        )
+    }
+
+def time_benchmark(func: Callable, calls: List[tuple], ops_per_call: int, repeat: int) -> Dict[str, float]:
+    """Time passes over the corpus with the collector paused, as timeit does."""
+    operations = len(calls) * ops_per_call
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            for args in calls:
+                func(*args)
+            timings.append((time.perf_counter_ns() - started) / operations)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    
+    timings.sort()
+    return {
+        'ns_per_op_min': round(timings[0], 1),
+        'ns_per_op_median': round(timings[len(timings) // 2], 1)
+    }
+
+def measure_allocations(func: Callable, calls: List[tuple], ops_per_call: int) -> Dict[str, float]:
+    """Measure peak transient memory per call and allocated blocks per operation with tracemalloc."""
+    operations = len(calls) * ops_per_call
+    peak_total = 0
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for args in calls:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - baseline
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    
+    # Blocks still alive after the pass (e.g. cache growth) show up as retained memory
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return {
+        'peak_bytes_per_call': round(peak_total / len(calls), 1),
+        'peak_bytes_per_op': round(peak_total / operations, 1),
+        'retained_bytes_per_op': round(retained / operations, 1)
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def ns_change(stats: Dict[str, Any], base: Optional[Dict[str, Any]]) -> Optional[float]:
+    if not base or not base.get('ns_per_op_min'):
+        return None
+    return (stats['ns_per_op_min'] - base['ns_per_op_min']) / base['ns_per_op_min'] * 100
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print(f"\nCorpus: {report['corpus_size']} submissions  repeat: {report['repeat']}  "
+          f"python: {report['python']}  commit: {report['commit']}")
+    header = f"{'benchmark':<42} {'ns/op min':>12} {'ns/op med':>12} {'peak B/op':>11} {'retained B/op':>14}"
+    if baseline:
+        header += f" {'vs base':>9}"
+    print(header)
+    print("-" * len(header))
+    
+    for name, stats in report['benchmarks'].items():
+        line = (f"{name:<42} {stats['ns_per_op_min']:>12,.0f} {stats['ns_per_op_median']:>12,.0f} "
+                f"{stats['peak_bytes_per_op']:>11,.0f} {stats['retained_bytes_per_op']:>14,.1f}")
+        if baseline:
+            delta = ns_change(stats, baseline['benchmarks'].get(name))
+            line += f" {delta:>+8.1f}%" if delta is not None else f" {'n/a':>9}"
+        print(line)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for scoring, validation and analysis")
+    parser.add_argument('--corpus-size', type=int, default=2000, help="Synthetic submissions to generate")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed passes over the corpus per benchmark")
+    parser.add_argument('--seed', type=int, default=42, help="Corpus random seed")
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this text")
+    parser.add_argument('--no-allocations', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--compare', help="Baseline JSON report to compare against")
+    parser.add_argument('--max-regression', type=float,
+                        help="Exit non-zero if any benchmark's ns/op regresses by more than this percentage")
+    return parser.parse_args()
+
+def main() -> int:
+    args = parse_args()
+    corpus = generate_corpus(args.corpus_size, args.seed)
+    benchmarks = build_benchmarks(corpus)
+    
+    results = {}
+    for name, (func, calls, ops_per_call) in benchmarks.items():
+        if args.filter and args.filter not in name:
+            continue
+        # One untimed pass warms caches and lazily built tables
+        for call_args in calls:
+            func(*call_args)
+        stats = time_benchmark(func, calls, ops_per_call, args.repeat)
+        if args.no_allocations:
+            stats.update({'peak_bytes_per_call': 0, 'peak_bytes_per_op': 0, 'retained_bytes_per_op': 0})
+        else:
+            stats.update(measure_allocations(func, calls, ops_per_call))
+        results[name] = stats
+    
+    report = {
+        'created_at': datetime.utcnow().isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'corpus_size': args.corpus_size,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'benchmarks': results
+    }
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    
+    if baseline and args.max_regression is not None:
+        regressed = [
+            name for name, stats in results.items()
+            if (ns_change(stats, baseline['benchmarks'].get(name)) or 0) > args.max_regression
+        ]
+        if regressed:
+            print(f"\nns/op regressed by more than {args.max_regression}%: {', '.join(regressed)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
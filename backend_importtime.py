@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the API server.
+
+Imports backend/server.py in fresh interpreters with ``python -X importtime`` and
+fails when the median cold import exceeds a budget, or when a module that is
+supposed to load lazily (the Stripe SDK, numpy, redis) is imported at startup. Prints
+the slowest imports of the median run so a regression points at its cause.
+
+Usage:
+    python backend_importtime.py [--budget-ms 750] [--runs 5] [--top 15] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / 'backend'
+
+# Only loaded on first use (real Stripe calls, batch rescoring, shared cache connect), never while importing the app
+LAZY_MODULES = ('stripe', 'numpy', 'redis')
+
+def import_once(module: str) -> List[Tuple[str, int, int]]:
+    """Import ``module`` in a fresh interpreter; return (name, self_us, cumulative_us) per imported module."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, env={**os.environ, 'PYTHONPATH': str(BACKEND_DIR)},
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+def measure(module: str, runs: int) -> Dict[str, Any]:
+    # One untimed run writes bytecode caches, as a built container image would have them
+    import_once(module)
+    samples = []
+    for _ in range(runs):
+        timings = import_once(module)
+        total_us = next(cumulative for name, _, cumulative in timings if name == module)
+        samples.append((total_us, timings))
+    
+    samples.sort(key=lambda sample: sample[0])
+    median_us, median_timings = samples[len(samples) // 2]
+    imported = {name for name, _, _ in median_timings}
+    return {
+        'module': module,
+        'runs': runs,
+        'min_ms': round(samples[0][0] / 1000, 1),
+        'median_ms': round(median_us / 1000, 1),
+        'lazy_modules_imported': [
+            lazy for lazy in LAZY_MODULES
+            if any(name == lazy or name.startswith(f'{lazy}.') for name in imported)
+        ],
+        'slowest': [
+            {'module': name, 'self_ms': round(self_us / 1000, 1), 'cumulative_ms': round(cumulative_us / 1000, 1)}
+            for name, self_us, cumulative_us in sorted(median_timings, key=lambda timing: -timing[1])
+        ]
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cold import time budget for the API server")
+    parser.add_argument('--module', default='server', help="Module to import from backend/")
+    parser.add_argument('--budget-ms', type=float, default=750, help="Fail if the median import takes longer")
+    parser.add_argument('--runs', type=int, default=5, help="Timed imports, each in a fresh interpreter")
+    parser.add_argument('--top', type=int, default=15, help="Slowest imports (by self time) to print")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    return parser.parse_args()
+
+def main() -> int:
+    args = parse_args()
+    report = measure(args.module, args.runs)
+    report['budget_ms'] = args.budget_ms
+    
+    print(f"\nimport {report['module']}: median {report['median_ms']:.1f} ms, min {report['min_ms']:.1f} ms "
+          f"over {report['runs']} runs (budget {args.budget_ms:.0f} ms)")
+    header = f"{'module':<48} {'self ms':>9} {'cumulative ms':>14}"
+    print(header)
+    print("-" * len(header))
+    for timing in report['slowest'][:args.top]:
+        print(f"{timing['module']:<48} {timing['self_ms']:>9.1f} {timing['cumulative_ms']:>14.1f}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    
+    failed = False
+    if report['median_ms'] > args.budget_ms:
+        print(f"\nImport time {report['median_ms']:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if report['lazy_modules_imported']:
+        print(f"\nImported at startup but meant to load lazily: {', '.join(report['lazy_modules_imported'])}")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Async load test and latency benchmark for the VC/Investor Test API.
+
+Drives the full user flow (validate -> evaluate -> get evaluation ->
+create payment intent -> unlock premium -> get evaluation) with the realistic
+idea/launched payloads from backend_test.py at a configurable concurrency,
+then reports p50/p95/p99 latency and throughput per endpoint.
+
+Targets:
+    --url http://localhost:8001/api   a running backend (local mongod)
+    --in-process                      the ASGI app in this process on the MONGO_URL database
+    --in-process --mongomock          the ASGI app on an in-memory mongomock database
+
+Results are written as JSON so runs can be compared between commits:
+    python backend_loadtest.py --in-process --mongomock --output baseline.json
+    python backend_loadtest.py --in-process --mongomock --compare baseline.json --max-regression 20
+
+Usage:
+    python backend_loadtest.py [--flows 200] [--concurrency 20] [--warmup 10] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+from backend_test import VCTestAPITester
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / 'backend'
+
+ENDPOINTS = [
+    'POST /vc-test/validate',
+    'POST /vc-test/evaluate',
+    'GET /vc-test/evaluation/{id}',
+    'POST /payments/create-intent',
+    'POST /vc-test/unlock-premium',
+    'GET /vc-test/evaluation/{id} (unlocked)'
+]
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class LoadTestRecorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+        self.errors: Dict[str, int] = {name: 0 for name in ENDPOINTS}
+        self.status_codes: Dict[str, Dict[str, int]] = {name: {} for name in ENDPOINTS}
+        self.enabled = True
+    
+    def record(self, endpoint: str, elapsed_ms: float, status_code: int, ok: bool):
+        if not self.enabled:
+            return
+        self.latencies[endpoint].append(elapsed_ms)
+        codes = self.status_codes[endpoint]
+        codes[str(status_code)] = codes.get(str(status_code), 0) + 1
+        if not ok:
+            self.errors[endpoint] += 1
+    
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        endpoints = {}
+        for name in ENDPOINTS:
+            values = sorted(self.latencies[name])
+            if not values:
+                continue
+            endpoints[name] = {
+                'requests': len(values),
+                'errors': self.errors[name],
+                'status_codes': self.status_codes[name],
+                'throughput_rps': round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+                'mean_ms': round(sum(values) / len(values), 3),
+                'p50_ms': round(percentile(values, 50), 3),
+                'p95_ms': round(percentile(values, 95), 3),
+                'p99_ms': round(percentile(values, 99), 3),
+                'max_ms': round(values[-1], 3)
+            }
+        return endpoints
+
+class LoadTester:
+    def __init__(self, client: httpx.AsyncClient, recorder: LoadTestRecorder):
+        self.client = client
+        self.recorder = recorder
+        self.payloads = VCTestAPITester()
+    
+    async def request(self, endpoint: str, method: str, path: str, expected_status: int = 200,
+                      body: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Send one request, record its latency and return the JSON body on the expected status."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, json=body)
+        except httpx.HTTPError:
+            self.recorder.record(endpoint, (time.perf_counter() - started) * 1000, 0, False)
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ok = response.status_code == expected_status
+        self.recorder.record(endpoint, elapsed_ms, response.status_code, ok)
+        return response.json() if ok else None
+    
+    async def run_flow(self, flow_number: int):
+        """Run one complete submission and premium unlock flow."""
+        if flow_number % 2:
+            startup_type, form_data = 'launched', self.payloads.get_realistic_launched_form_data()
+        else:
+            startup_type, form_data = 'idea', self.payloads.get_realistic_idea_form_data()
+        
+        body = {
+            'form_data': form_data,
+            'session_metadata': self.payloads.get_session_metadata(),
+            'startup_type': startup_type
+        }
+        
+        if await self.request(ENDPOINTS[0], 'POST', '/vc-test/validate', body=body) is None:
+            return
+        evaluation = await self.request(ENDPOINTS[1], 'POST', '/vc-test/evaluate', body=body)
+        if evaluation is None:
+            return
+        evaluation_id = evaluation['data']['evaluation_id']
+        
+        await self.request(ENDPOINTS[2], 'GET', f'/vc-test/evaluation/{evaluation_id}')
+        intent = await self.request(ENDPOINTS[3], 'POST', '/payments/create-intent',
+                                    body={'evaluation_id': evaluation_id})
+        if intent is None:
+            return
+        
+        unlock_body = {
+            'evaluation_id': evaluation_id,
+            'stripe_payment_intent_id': intent['data']['payment_intent_id']
+        }
+        if await self.request(ENDPOINTS[4], 'POST', '/vc-test/unlock-premium', body=unlock_body) is None:
+            return
+        await self.request(ENDPOINTS[5], 'GET', f'/vc-test/evaluation/{evaluation_id}')
+    
+    async def run(self, flows: int, concurrency: int) -> float:
+        """Run flows across concurrency workers and return the wall time in seconds."""
+        queue = asyncio.Queue()
+        for flow_number in range(flows):
+            queue.put_nowait(flow_number)
+        
+        async def worker():
+            while True:
+                try:
+                    flow_number = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self.run_flow(flow_number)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return time.perf_counter() - started
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def patch_mongomock_updates():
+    """Teach mongomock the two find_one_and_update features the unlock fast path uses.
+    
+    mongomock has no $unset pipeline stage, and it finds the ReturnDocument.AFTER result by re-running
+    the original filter, which misses once the update stops it matching. Both are emulated here, so
+    --mongomock runs the production queries unchanged.
+    """
+    import mongomock.collection
+    original = mongomock.collection.Collection.find_one_and_update
+    
+    def resolve(document, value):
+        if not isinstance(value, str) or not value.startswith('$'):
+            return value
+        for part in value[1:].split('.'):
+            document = document.get(part) if isinstance(document, dict) else None
+        return document
+    
+    def find_one_and_update(self, filter, update, *args, **kwargs):
+        if kwargs.get('upsert'):
+            return original(self, filter, update, *args, **kwargs)
+        document = self.find_one(filter, session=kwargs.get('session'))
+        if document is None:
+            return None
+        if isinstance(update, list):
+            # Flatten $set/$unset stages into a classic update, resolving "$field" references
+            sets, unsets = {}, {}
+            for stage in update:
+                for field, value in stage.get('$set', {}).items():
+                    sets[field] = resolve(document, value)
+                unset = stage.get('$unset', [])
+                unsets.update({field: "" for field in ([unset] if isinstance(unset, str) else unset)})
+            update = {'$set': sets, **({'$unset': unsets} if unsets else {})}
+        # Target the matched document by _id, which the AFTER lookup can still find
+        return original(self, {'_id': document['_id']}, update, *args, **kwargs)
+    
+    mongomock.collection.Collection.find_one_and_update = find_one_and_update
+
+async def open_in_process_app(use_mongomock: bool, stack: AsyncExitStack):
+    """Import the FastAPI app and enter its lifespan on ``stack``, optionally on mongomock."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    
+    from services.database import database
+    if use_mongomock:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--mongomock requires the mongomock-motor package (pip install mongomock-motor)")
+        patch_mongomock_updates()
+        database.client = AsyncMongoMockClient()
+        database.db = database.client[os.environ.get('DB_NAME', 'app_db')]
+    
+    from server import app
+    # Startup and shutdown live in the app's lifespan handler; closing the stack runs the shutdown half
+    await stack.enter_async_context(app.router.lifespan_context(app))
+    return app
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print(f"\nTarget: {report['target']}  flows: {report['flows']}  concurrency: {report['concurrency']}  "
+          f"wall: {report['wall_seconds']}s  commit: {report['commit']}")
+    header = f"{'endpoint':<40} {'reqs':>6} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    print(header)
+    print("-" * len(header))
+    
+    for name, stats in report['endpoints'].items():
+        line = (f"{name:<40} {stats['requests']:>6} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+                f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+        if baseline:
+            delta = p95_change(stats, baseline['endpoints'].get(name))
+            line += f" {delta:>+11.1f}%" if delta is not None else f" {'n/a':>12}"
+        print(line)
+
+def p95_change(stats: Dict[str, Any], base: Optional[Dict[str, Any]]) -> Optional[float]:
+    if not base or not base.get('p95_ms'):
+        return None
+    return (stats['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Async load test for the VC/Investor Test API")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help="Base URL of a running backend, e.g. http://localhost:8001/api")
+    target.add_argument('--in-process', action='store_true', help="Run the ASGI app inside this process")
+    parser.add_argument('--mongomock', action='store_true', help="Use an in-memory mongomock database (with --in-process)")
+    parser.add_argument('--flows', type=int, default=200, help="Measured user flows to run")
+    parser.add_argument('--concurrency', type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument('--warmup', type=int, default=10, help="Unmeasured flows run first")
+    parser.add_argument('--timeout', type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--compare', help="Baseline JSON report to compare against")
+    parser.add_argument('--max-regression', type=float,
+                        help="Exit non-zero if any endpoint's p95 regresses by more than this percentage")
+    args = parser.parse_args()
+    if args.mongomock and not args.in_process:
+        parser.error("--mongomock requires --in-process")
+    return args
+
+async def main() -> int:
+    args = parse_args()
+    
+    stack = AsyncExitStack()
+    if args.in_process:
+        app = await open_in_process_app(args.mongomock, stack)
+        transport = httpx.ASGITransport(app=app)
+        base_url = 'http://loadtest/api'
+        target = 'in-process (mongomock)' if args.mongomock else 'in-process'
+    else:
+        transport = httpx.AsyncHTTPTransport(retries=0)
+        base_url = args.url.rstrip('/')
+        target = base_url
+    
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    recorder = LoadTestRecorder()
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=base_url,
+                                     timeout=args.timeout, limits=limits) as client:
+            tester = LoadTester(client, recorder)
+            if args.warmup:
+                recorder.enabled = False
+                await tester.run(args.warmup, min(args.concurrency, args.warmup))
+                recorder.enabled = True
+            wall_seconds = await tester.run(args.flows, args.concurrency)
+    finally:
+        await stack.aclose()
+    
+    report = {
+        'created_at': datetime.utcnow().isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'target': target,
+        'flows': args.flows,
+        'concurrency': args.concurrency,
+        'wall_seconds': round(wall_seconds, 3),
+        'flows_per_second': round(args.flows / wall_seconds, 2) if wall_seconds else 0.0,
+        'endpoints': recorder.summary(wall_seconds)
+    }
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    
+    if baseline and args.max_regression is not None:
+        regressed = [
+            name for name, stats in report['endpoints'].items()
+            if (p95_change(stats, baseline['endpoints'].get(name)) or 0) > args.max_regression
+        ]
+        if regressed:
+            print(f"\np95 regressed by more than {args.max_regression}%: {', '.join(regressed)}")
+            return 1
+    
+    failed = sum(stats['errors'] for stats in report['endpoints'].values())
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
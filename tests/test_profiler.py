@@ -0,0 +1,33 @@
+import threading
+
+from services.profiler import SamplingProfiler
+
+def busy_wait(stop: threading.Event):
+    while not stop.is_set():
+        stop.wait(0.001)
+
+def test_samples_only_the_thread_serving_the_request():
+    profiler = SamplingProfiler(enabled=True, sample_rate=1.0, interval_ms=1)
+    stop = threading.Event()
+    other = threading.Thread(target=busy_wait, args=(stop,), name='unrelated-worker', daemon=True)
+    other.start()
+
+    profiler.request_started()
+    for _ in range(5):
+        profiler._sample()
+    profiler.request_finished()
+    stop.set()
+    other.join()
+
+    collapsed = profiler.collapsed()
+    assert profiler.samples == 5
+    assert 'unrelated-worker' not in collapsed
+    assert all(line.startswith(threading.current_thread().name) for line in collapsed.splitlines())
+
+def test_nothing_is_sampled_after_the_last_request_finishes():
+    profiler = SamplingProfiler(enabled=True, sample_rate=1.0, interval_ms=1)
+    profiler.request_started()
+    profiler.request_finished()
+    profiler._sample()
+
+    assert profiler.samples == 0 and profiler.collapsed() == ''
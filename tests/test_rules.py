@@ -0,0 +1,9 @@
+import json
+
+from services.rules import rules_provider
+
+def test_status_reports_file_name_only():
+    # The status is served by the unauthenticated /api/health and the metrics collector
+    status = rules_provider.status()
+    assert status['source'] == rules_provider.path.name
+    assert str(rules_provider.path.parent) not in json.dumps(status)
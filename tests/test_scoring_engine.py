@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from services.scoring_engine import ScoringEngine
+
+engine = ScoringEngine()
+
+WORDS = ['market', 'customer', 'growth', 'platform', 'revenue', 'team', 'data', 'scale']
+
+def random_value(rng: random.Random, field_id: str):
+    """A value of any shape a client could post, valid or not."""
+    options = list(engine.scoring_matrix.get(field_id, {}))
+    if options and rng.random() < 0.7:
+        return rng.choice(options)
+    kind = rng.randrange(10)
+    if kind == 4:
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 150)))
+    if kind == 5 and not options:
+        # Lists are checkbox answers; on a single-choice field they make the whole submission unscorable
+        return [rng.choice(WORDS) for _ in range(rng.randint(0, 8))]
+    if kind == 6:
+        return rng.randint(-1000, 100000)
+    if kind == 7:
+        return rng.uniform(-100, 5000)
+    if kind == 8:
+        return rng.choice([float('nan'), float('inf'), float('-inf'), 10 ** 400, -(10 ** 400), True, False, 0, 0.0])
+    if kind == 9:
+        return rng.choice(['', 'unknown-option', None])
+    return rng.choice(WORDS)
+
+def random_submission(rng: random.Random):
+    fields = set(engine.scoring_matrix)
+    for sections in engine.section_fields.values():
+        fields.update(sections)
+    form_data = {field_id: random_value(rng, field_id) for field_id in sorted(fields) if rng.random() < 0.8}
+    if rng.random() < 0.05:
+        # An unhashable answer to a single-choice field yields the error result on both paths
+        form_data[rng.choice(sorted(engine.scoring_matrix))] = rng.choice([{'nested': 1}, ['a'], {'a', 'b'}])
+    return form_data, rng.choice(['idea', 'launched', 'unknown-stage'])
+
+@pytest.mark.parametrize('seed', range(20))
+def test_batch_matches_scalar_for_fuzzed_submissions(seed):
+    rng = random.Random(seed)
+    submissions = [random_submission(rng) for _ in range(50)]
+    form_data_batch = [form_data for form_data, _ in submissions]
+    startup_types = [startup_type for _, startup_type in submissions]
+
+    expected = [engine.calculate_score(form_data, startup_type) for form_data, startup_type in submissions]
+
+    assert engine.calculate_scores_batch(form_data_batch, startup_types) == expected
+
+@pytest.mark.parametrize('form_data, startup_type', [
+    ({}, 'idea'),
+    ({}, 'launched'),
+    ({'team-size': '2-3', 'cac': 150, 'ltv': 2400}, 'launched'),
+    ({'cac': float('nan'), 'churn-rate': 10 ** 400}, 'launched'),
+    ({'team-size': ['a', 'b'], 'defensibility': []}, 'idea'),
+    ({'team-size': {'unhashable': True}}, 'idea'),
+])
+def test_batch_matches_scalar_for_edge_cases(form_data, startup_type):
+    expected = engine.calculate_score(form_data, startup_type)
+
+    assert engine.calculate_scores_batch([form_data], startup_type) == [expected]
+    assert engine.calculate_scores_batch([form_data, form_data], [startup_type, startup_type]) == [expected, expected]
+
+def test_batch_rejects_mismatched_startup_types():
+    with pytest.raises(ValueError):
+        engine.calculate_scores_batch([{}, {}], ['idea'])
@@ -0,0 +1,148 @@
+import json
+import random
+import re
+import time
+
+import pytest
+
+from services.rules import Rules, rules_provider
+from services.validation_service import ValidationService
+
+def reference_sanitize_input(value):
+    """sanitize_input as it was before the regexes were precompiled; the output must not change."""
+    if isinstance(value, str):
+        value = re.sub(r'<[^>]*>', '', value)
+        value = value.replace('&', '&amp;')
+        value = value.replace('<', '&lt;')
+        value = value.replace('>', '&gt;')
+        value = value.replace('"', '&quot;')
+        value = value.replace("'", '&#x27;')
+    return value
+
+def reference_sanitize_form_data(form_data):
+    return {
+        key: [reference_sanitize_input(item) for item in value] if isinstance(value, list) else reference_sanitize_input(value)
+        for key, value in form_data.items()
+    }
+
+FRAGMENTS = ['<b>', '</b>', '<', '>', '&', '"', "'", '&amp;', '<script>alert(1)</script>', '<<>>', 'plain', ' ', 'é', '\n']
+
+def random_text(rng: random.Random) -> str:
+    return ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 12)))
+
+def session_metadata(seconds_ago: int = 300):
+    return {'user_uuid': 'test', 'start_time': int(time.time() * 1000) - seconds_ago * 1000}
+
+def idea_form_data():
+    return {
+        'team-size': '2-3',
+        'founder-experience': 'some-experience',
+        'technical-expertise': 'tech-cofounder',
+        'domain-expertise': 'deep-expertise',
+        'commitment-level': 'full-time',
+        'market-size-tam': '1b-10b',
+        'market-size-som': '100m-500m',
+        'market-growth': 'growing',
+        'market-timing': 'perfect-timing',
+        'customer-segment': 'Small e-commerce businesses struggling with <b>inventory</b> & demand forecasting. ' * 3,
+        'problem-severity': 'significant-pain',
+        'problem-frequency': 'daily',
+        'current-solution': 'poor-alternatives',
+        'solution-uniqueness': 'breakthrough',
+        'value-proposition': "Our platform reduces stockouts by 40% and excess inventory by 30% for the \"long tail\". " * 2,
+        'defensibility': ['network-effects', 'data-moats'],
+        'ip-protection': 'pending-patents',
+        'competitive-timeline': 'year-plus',
+        'revenue-model': 'subscription',
+        'pricing-strategy': 'Tiered SaaS pricing from $299/month, with enterprise plans for larger catalogues. ' * 2,
+        'unit-economics-visibility': 'solid-projections',
+        'scalability': 'high-leverage',
+        'validation-type': ['customer-interviews', 'pilot-customers'],
+        'customer-count': '11-50'
+    }
+
+@pytest.mark.parametrize('value, expected', [
+    ('<b>bold</b> & "quoted"', 'bold &amp; &quot;quoted&quot;'),
+    ("it's", 'it&#x27;s'),
+    ('a < b > c', 'a  c'),
+    ('1 > 0 & 0 < 1', '1 &gt; 0 &amp; 0 &lt; 1'),
+    ('<script>alert(1)</script>', 'alert(1)'),
+    ('no markup', 'no markup'),
+    (42, 42),
+    (None, None),
+])
+def test_sanitize_input_cases(value, expected):
+    assert ValidationService().sanitize_input(value) == expected
+
+@pytest.mark.parametrize('seed', range(10))
+def test_sanitize_form_data_matches_reference(seed):
+    rng = random.Random(seed)
+    form_data = {
+        f'field-{index}': [random_text(rng) for _ in range(rng.randint(0, 4))] if rng.random() < 0.3
+        else rng.choice([random_text(rng), random_text(rng), rng.randint(0, 100), None, 1.5])
+        for index in range(40)
+    }
+
+    assert ValidationService().sanitize_form_data(form_data) == reference_sanitize_form_data(form_data)
+
+@pytest.mark.parametrize('form_data, seconds_ago', [
+    (idea_form_data(), 300),
+    (idea_form_data(), 30),
+    ({**idea_form_data(), 'team-size': ''}, 300),
+    ({**idea_form_data(), 'value-proposition': 'lorem ipsum test test test'}, 300),
+    ({'team-size': '<i>2-3</i>'}, 300),
+])
+def test_sanitize_and_validate_matches_uncached_path(form_data, seconds_ago):
+    service = ValidationService()
+    metadata = session_metadata(seconds_ago)
+    sanitized = service.sanitize_form_data(form_data)
+    expected = (sanitized, *service.validate_submission(sanitized, metadata, 'idea'))
+
+    # The first call fills the cache and the second is served from it; both must match
+    assert service.sanitize_and_validate(form_data, metadata, 'idea') == expected
+    assert service.sanitize_and_validate(form_data, metadata, 'idea') == expected
+
+def test_cached_results_are_copies():
+    service = ValidationService()
+    sanitized, _, errors, flags = service.sanitize_and_validate(idea_form_data(), session_metadata(), 'idea')
+    sanitized['team-size'] = 'changed'
+    errors.append('changed')
+    flags.append('changed')
+
+    sanitized, is_valid, errors, flags = service.sanitize_and_validate(idea_form_data(), session_metadata(), 'idea')
+    assert sanitized['team-size'] == '2-3'
+    assert 'changed' not in errors and 'changed' not in flags
+
+def test_completion_time_is_checked_on_cache_hits():
+    service = ValidationService()
+    assert service.sanitize_and_validate(idea_form_data(), session_metadata(300), 'idea')[1]
+
+    _, is_valid, _, flags = service.sanitize_and_validate(idea_form_data(), session_metadata(5), 'idea')
+    assert not is_valid and flags
+
+def rules_with_extra_required_field() -> Rules:
+    """The next rules version, which also requires 'funding-amount' for ideas."""
+    with open(rules_provider.path, encoding='utf-8') as f:
+        raw = json.load(f)
+    raw['version'] += 1
+    raw['validation']['required_fields']['idea'] = [*raw['validation']['required_fields']['idea'], 'funding-amount']
+    return Rules(raw)
+
+def test_rules_reload_invalidates_cached_results(monkeypatch):
+    service = ValidationService()
+    before = service.sanitize_and_validate(idea_form_data(), session_metadata(), 'idea')
+    assert before[1] and not before[2]
+
+    monkeypatch.setattr(rules_provider, 'current', rules_with_extra_required_field())
+
+    _, is_valid, errors, _ = service.sanitize_and_validate(idea_form_data(), session_metadata(), 'idea')
+    assert not is_valid
+    assert "Field 'funding-amount' is required" in errors
+
+def test_pinned_rules_ignore_reloads(monkeypatch):
+    service = ValidationService(rules=rules_provider.current)
+    assert service.sanitize_and_validate(idea_form_data(), session_metadata(), 'idea')[1]
+
+    monkeypatch.setattr(rules_provider, 'current', rules_with_extra_required_field())
+
+    assert service.sanitize_and_validate(idea_form_data(), session_metadata(), 'idea')[1]